@@ -6,9 +6,10 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from .models import Amenity
 from .serializers import AmenitySerializer
 from apps.users.permissions import IsAdmin
+from rental_project.instrumentation import InstrumentedViewMixin
 
 
-class AmenityViewSet(viewsets.ModelViewSet):
+class AmenityViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """ViewSet for Amenity model."""
     
     queryset = Amenity.objects.all()
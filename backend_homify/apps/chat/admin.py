@@ -2,7 +2,7 @@
 Admin configuration for messages app.
 """
 from django.contrib import admin
-from .models import Message
+from .models import Conversation, Message
 
 
 @admin.register(Message)
@@ -13,3 +13,12 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'sent_at')
     search_fields = ('sender__email', 'recipient__email', 'subject', 'content')
     readonly_fields = ('sent_at', 'read_at')
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    """Admin for Conversation model."""
+    
+    list_display = ('property', 'tenant', 'landlord', 'last_message_at', 'tenant_unread', 'landlord_unread')
+    search_fields = ('tenant__email', 'landlord__email', 'property__title')
+    readonly_fields = ('created_at',)
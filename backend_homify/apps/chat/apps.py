@@ -0,0 +1,14 @@
+"""
+App configuration for messages app.
+"""
+from django.apps import AppConfig
+
+
+class ChatConfig(AppConfig):
+    """Configuration for messages app."""
+    
+    name = 'apps.chat'
+    verbose_name = 'Messages'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,115 @@
+"""
+Conversation threads.
+
+Every message belongs to the conversation of its (property, tenant,
+landlord) triple. The conversation keeps the latest message, a snippet
+and one unread counter per participant, updated with atomic UPDATEs when
+a message is sent or read, so the conversation list never has to scan
+messages.
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import unread
+from .models import Conversation, Message
+
+SNIPPET_LENGTH = 140
+
+
+def snippet(content):
+    content = ' '.join(content.split())
+    if len(content) <= SNIPPET_LENGTH:
+        return content
+    return content[:SNIPPET_LENGTH - 1].rstrip() + '…'
+
+
+def participants(message, landlord_id):
+    """Return (tenant_id, landlord_id) of a message's conversation."""
+    tenant_id = message.sender_id if message.sender_id != landlord_id else message.recipient_id
+    return tenant_id, landlord_id
+
+
+def record_message(message):
+    """Attach a new message to its conversation and count it as unread."""
+    landlord_id = message.property.landlord_id
+    tenant_id, landlord_id = participants(message, landlord_id)
+
+    with transaction.atomic():
+        conversation, _ = Conversation.objects.get_or_create(
+            property_id=message.property_id,
+            tenant_id=tenant_id,
+            landlord_id=landlord_id,
+            defaults={'last_message_at': message.sent_at},
+        )
+        unread_field = 'landlord_unread' if message.recipient_id == landlord_id else 'tenant_unread'
+        Conversation.objects.filter(pk=conversation.pk).update(
+            last_message=message,
+            last_message_snippet=snippet(message.content),
+            last_message_at=message.sent_at,
+            **{unread_field: F(unread_field) + 1}
+        )
+        Message.objects.filter(pk=message.pk).update(conversation=conversation)
+    unread.adjust(message.recipient_id, 1)
+
+    message.conversation = conversation
+    return conversation
+
+
+def record_read(message):
+    """Decrement the recipient's unread counters after a message was read."""
+    unread.adjust(message.recipient_id, -1)
+    if message.conversation_id is None:
+        return
+    field = 'landlord_unread' if message.recipient_id == message.property.landlord_id else 'tenant_unread'
+    Conversation.objects.filter(pk=message.conversation_id, **{f'{field}__gt': 0}).update(
+        **{field: F(field) - 1}
+    )
+
+
+def mark_read(user, messages):
+    """
+    Mark the user's unread messages among `messages` as read.
+    
+    The messages are flagged by one conditional UPDATE, then the counters
+    of the affected conversations are recounted. Returns the read time and
+    the (id, conversation_id, sender_id) rows that were marked.
+    """
+    read_at = timezone.now()
+    with transaction.atomic():
+        # Locked so that concurrent calls do not report the same messages
+        rows = list(
+            messages.filter(recipient=user, is_read=False).select_for_update()
+            .values_list('pk', 'conversation_id', 'sender_id')
+        )
+        if rows:
+            Message.objects.filter(pk__in=[pk for pk, _, _ in rows], is_read=False).update(
+                is_read=True, read_at=read_at
+            )
+            recount_unread({conversation_id for _, conversation_id, _ in rows if conversation_id})
+            unread.set_count(user.pk, unread.conversation_total(user.pk))
+    return read_at, rows
+
+
+def _unread_of(participant):
+    return Coalesce(
+        Subquery(
+            Message.objects.filter(
+                conversation=OuterRef('pk'), recipient=OuterRef(participant), is_read=False
+            ).values('conversation').annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def recount_unread(conversation_ids=None):
+    """Recompute the unread counters of the given conversations, or of all."""
+    conversations = Conversation.objects.all()
+    if conversation_ids is not None:
+        conversations = conversations.filter(pk__in=conversation_ids)
+    return conversations.update(
+        tenant_unread=_unread_of('tenant'),
+        landlord_unread=_unread_of('landlord'),
+    )
@@ -0,0 +1,71 @@
+"""
+Real-time chat events.
+
+Events are published on a per-user Redis pub/sub channel once the
+surrounding transaction commits. Whichever ASGI worker holds that user's
+event stream (see `streams.py`) forwards them to the browser, so workers
+do not need to know about each other.
+"""
+import json
+import logging
+
+import redis
+from django.db import transaction
+
+from rental_project.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'chat:events:{}'
+
+
+def channel_for(user_id):
+    return CHANNEL.format(user_id)
+
+
+def publish(user_id, event, data):
+    """Send an event to a user's stream after the current transaction commits."""
+    payload = json.dumps({'event': event, 'data': data}, default=str)
+
+    def send():
+        try:
+            get_redis().publish(channel_for(user_id), payload)
+        except redis.RedisError:
+            logger.warning('Redis unavailable, %s event for user %s dropped.', event, user_id)
+
+    transaction.on_commit(send)
+
+
+def message_sent(message):
+    """Notify the recipient of a new message."""
+    publish(message.recipient_id, 'message', {
+        'id': message.pk,
+        'conversation': message.conversation_id,
+        'property': message.property_id,
+        'sender': message.sender_id,
+        'subject': message.subject,
+        'snippet': message.content[:140],
+        'sent_at': message.sent_at.isoformat(),
+    })
+
+
+def message_read(message):
+    """Send a read receipt to the sender of a message."""
+    publish(message.sender_id, 'read', {
+        'id': message.pk,
+        'conversation': message.conversation_id,
+        'read_at': message.read_at.isoformat(),
+    })
+
+
+def messages_read(rows, read_at):
+    """Send one batched read receipt per sender and conversation."""
+    batches = {}
+    for message_id, conversation_id, sender_id in rows:
+        batches.setdefault((sender_id, conversation_id), []).append(message_id)
+    for (sender_id, conversation_id), ids in batches.items():
+        publish(sender_id, 'read_batch', {
+            'ids': ids,
+            'conversation': conversation_id,
+            'read_at': read_at.isoformat(),
+        })
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_conversations(apps, schema_editor):
+    from apps.chat.conversations import snippet
+    Conversation = apps.get_model('chat', 'Conversation')
+    Message = apps.get_model('chat', 'Message')
+    
+    conversations = {}
+    messages = Message.objects.select_related('property').order_by('sent_at', 'id')
+    for message in messages.iterator():
+        landlord_id = message.property.landlord_id
+        tenant_id = message.sender_id if message.sender_id != landlord_id else message.recipient_id
+        key = (message.property_id, tenant_id, landlord_id)
+        if key not in conversations:
+            conversations[key] = (Conversation.objects.create(
+                property_id=message.property_id,
+                tenant_id=tenant_id,
+                landlord_id=landlord_id,
+                last_message_at=message.sent_at,
+            ), [])
+        conversation, ids = conversations[key]
+        ids.append(message.pk)
+        
+        conversation.last_message_id = message.pk
+        conversation.last_message_snippet = snippet(message.content)
+        conversation.last_message_at = message.sent_at
+        if not message.is_read:
+            if message.recipient_id == landlord_id:
+                conversation.landlord_unread += 1
+            else:
+                conversation.tenant_unread += 1
+    
+    for conversation, ids in conversations.values():
+        conversation.save()
+        Message.objects.filter(pk__in=ids).update(conversation=conversation)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('properties', '0011_activity_buckets'),
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_snippet', models.CharField(blank=True, max_length=140, verbose_name='Extrait')),
+                ('last_message_at', models.DateTimeField(verbose_name='Date du dernier message')),
+                ('tenant_unread', models.PositiveIntegerField(default=0, verbose_name='Non lus (locataire)')),
+                ('landlord_unread', models.PositiveIntegerField(default=0, verbose_name='Non lus (propriétaire)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('landlord', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='landlord_conversations', to=settings.AUTH_USER_MODEL, verbose_name='Propriétaire')),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message', verbose_name='Dernier message')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='properties.property', verbose_name='Propriété')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tenant_conversations', to=settings.AUTH_USER_MODEL, verbose_name='Locataire')),
+            ],
+            options={
+                'verbose_name': 'Conversation',
+                'verbose_name_plural': 'Conversations',
+                'ordering': ['-last_message_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='chat.conversation', verbose_name='Conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['tenant', '-last_message_at'], name='chat_conver_tenant__b724f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['landlord', '-last_message_at'], name='chat_conver_landlor_65c7ec_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='conversation',
+            unique_together={('property', 'tenant', 'landlord')},
+        ),
+        migrations.RunPython(fill_conversations, migrations.RunPython.noop),
+    ]
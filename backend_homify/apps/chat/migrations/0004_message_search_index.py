@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from apps.chat import search
+    search.create_index(schema_editor)
+    search.index_messages(using=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from apps.chat import search
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_message_recipient_is_read'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -5,6 +5,63 @@ from django.db import models
 from django.conf import settings
 
 
+class Conversation(models.Model):
+    """Thread between a tenant and the landlord of a property."""
+    
+    property = models.ForeignKey(
+        'properties.Property',
+        on_delete=models.CASCADE,
+        related_name='conversations',
+        verbose_name='Propriété'
+    )
+    tenant = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tenant_conversations',
+        verbose_name='Locataire'
+    )
+    landlord = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='landlord_conversations',
+        verbose_name='Propriétaire'
+    )
+    
+    # Denormalized from the latest message
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Dernier message'
+    )
+    last_message_snippet = models.CharField(max_length=140, blank=True, verbose_name='Extrait')
+    last_message_at = models.DateTimeField(verbose_name='Date du dernier message')
+    
+    tenant_unread = models.PositiveIntegerField(default=0, verbose_name='Non lus (locataire)')
+    landlord_unread = models.PositiveIntegerField(default=0, verbose_name='Non lus (propriétaire)')
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de création')
+    
+    class Meta:
+        verbose_name = 'Conversation'
+        verbose_name_plural = 'Conversations'
+        ordering = ['-last_message_at']
+        unique_together = ('property', 'tenant', 'landlord')
+        indexes = [
+            models.Index(fields=['tenant', '-last_message_at']),
+            models.Index(fields=['landlord', '-last_message_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.tenant_id} ↔ {self.landlord_id} ({self.property_id})"
+    
+    def unread_field(self, user):
+        """Return the unread counter field of a participant."""
+        return 'landlord_unread' if user.pk == self.landlord_id else 'tenant_unread'
+
+
 class Message(models.Model):
     """Message model for communication between users."""
     
@@ -14,6 +71,14 @@ class Message(models.Model):
         related_name='messages',
         verbose_name='Propriété'
     )
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='messages',
+        verbose_name='Conversation'
+    )
     sender = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -42,6 +107,7 @@ class Message(models.Model):
         indexes = [
             models.Index(fields=['recipient', '-sent_at']),
             models.Index(fields=['sender', '-sent_at']),
+            models.Index(fields=['recipient', 'is_read']),
         ]
     
     def __str__(self):
@@ -0,0 +1,186 @@
+"""
+Full-text search index for messages.
+
+Mirrors the property index: a `search_vector` tsvector column with a GIN
+index on PostgreSQL, an FTS5 shadow table keyed by the message id on
+SQLite. Subject is weighted above content. Both indexes also hold one
+`u<id>` token per participant, so a search is answered from the caller's
+own postings instead of every user's matching messages.
+
+Highlights are returned HTML-escaped, with matches wrapped in <mark>.
+"""
+import html
+
+from django.db import connection
+from django.db.models import BooleanField, CharField, FloatField
+from django.db.models.expressions import RawSQL
+
+from apps.properties.search import SEARCH_CONFIG, build_fts5_query
+
+MESSAGE_TABLE = 'chat_message'
+FTS_TABLE = 'chat_message_fts'
+
+# bm25 column weights for subject, content and participants
+FTS_WEIGHTS = (5.0, 1.0, 0.0)
+
+# Control characters cannot occur in stored text, so they safely mark matches
+START_MARK, STOP_MARK = '\x02', '\x03'
+ELLIPSIS = '…'
+SNIPPET_TOKENS = 24
+
+
+def participant_token(user_id):
+    return f'u{int(user_id)}'
+
+
+def create_index(schema_editor):
+    """Create the index structures for the schema editor's database."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'ALTER TABLE {MESSAGE_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS chat_message_search_idx '
+            f'ON {MESSAGE_TABLE} USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            f"subject, content, participants, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_index(schema_editor):
+    """Drop the index structures created by `create_index`."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS chat_message_search_idx')
+        schema_editor.execute(f'ALTER TABLE {MESSAGE_TABLE} DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def index_messages(message_ids=None, using=None):
+    """(Re)index the given messages, or every message when ids is None."""
+    conn = using or connection
+    if message_ids is not None:
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            sql = (
+                f'UPDATE {MESSAGE_TABLE} AS m SET search_vector = '
+                f"setweight(to_tsvector(%s::regconfig, coalesce(m.subject, '')), 'A') || "
+                f"setweight(to_tsvector(%s::regconfig, coalesce(m.content, '')), 'B') || "
+                f"to_tsvector('simple', 'u' || m.sender_id || ' u' || m.recipient_id)"
+            )
+            params = [SEARCH_CONFIG] * 2
+            if message_ids is not None:
+                sql += ' WHERE m.id = ANY(%s)'
+                params.append(message_ids)
+            cursor.execute(sql, params)
+
+        elif conn.vendor == 'sqlite':
+            select = (
+                f'INSERT INTO {FTS_TABLE} (rowid, subject, content, participants) '
+                f"SELECT m.id, m.subject, m.content, 'u' || m.sender_id || ' u' || m.recipient_id "
+                f'FROM {MESSAGE_TABLE} m'
+            )
+            if message_ids is None:
+                cursor.execute(f'DELETE FROM {FTS_TABLE}')
+                cursor.execute(select)
+            else:
+                placeholders = ', '.join(['%s'] * len(message_ids))
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', message_ids
+                )
+                cursor.execute(f'{select} WHERE m.id IN ({placeholders})', message_ids)
+
+
+def remove_messages(message_ids, using=None):
+    """Drop deleted messages from the index."""
+    conn = using or connection
+    message_ids = list(message_ids)
+    if conn.vendor != 'sqlite' or not message_ids:
+        # The PostgreSQL vector lives on the row itself
+        return
+
+    placeholders = ', '.join(['%s'] * len(message_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', message_ids)
+
+
+def search_messages(queryset, terms, user):
+    """
+    Restrict queryset to the user's messages matching terms.
+
+    Annotates `search_rank`, `subject_highlight` and `content_snippet`.
+    """
+    token = participant_token(user.pk)
+
+    if connection.vendor == 'postgresql':
+        terms_query = 'websearch_to_tsquery(%s::regconfig, %s)'
+        terms_params = (SEARCH_CONFIG, terms)
+        match = RawSQL(
+            f"{MESSAGE_TABLE}.search_vector @@ ({terms_query} && to_tsquery('simple', %s))",
+            (*terms_params, f'{token}:D'), output_field=BooleanField()
+        )
+        rank = RawSQL(
+            f'ts_rank({MESSAGE_TABLE}.search_vector, {terms_query})',
+            terms_params, output_field=FloatField()
+        )
+        options = f'StartSel={START_MARK}, StopSel={STOP_MARK}'
+        subject = RawSQL(
+            f'ts_headline(%s::regconfig, {MESSAGE_TABLE}.subject, {terms_query}, %s)',
+            (SEARCH_CONFIG, *terms_params, f'{options}, HighlightAll=true'),
+            output_field=CharField()
+        )
+        snippet = RawSQL(
+            f'ts_headline(%s::regconfig, {MESSAGE_TABLE}.content, {terms_query}, %s)',
+            (SEARCH_CONFIG, *terms_params,
+             f'{options}, MaxWords={SNIPPET_TOKENS}, MinWords=8, MaxFragments=2, '
+             f'FragmentDelimiter=" {ELLIPSIS} "'),
+            output_field=CharField()
+        )
+
+    else:
+        query = build_fts5_query(terms)
+        if not query:
+            return queryset.none()
+        query = f'participants : "{token}" AND {{subject content}} : ({query})'
+
+        def fts(expression, output_field):
+            return RawSQL(
+                f'(SELECT {expression} FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {MESSAGE_TABLE}.id)',
+                (query,), output_field=output_field
+            )
+
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        match = RawSQL(
+            f'{MESSAGE_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+            (query,), output_field=BooleanField()
+        )
+        # bm25 is lower for better matches
+        rank = fts(f'-bm25({FTS_TABLE}, {weights})', FloatField())
+        subject = fts(
+            f"highlight({FTS_TABLE}, 0, '{START_MARK}', '{STOP_MARK}')", CharField()
+        )
+        snippet = fts(
+            f"snippet({FTS_TABLE}, 1, '{START_MARK}', '{STOP_MARK}', '{ELLIPSIS}', {SNIPPET_TOKENS})",
+            CharField()
+        )
+
+    return queryset.filter(match).annotate(
+        search_rank=rank, subject_highlight=subject, content_snippet=snippet
+    )
+
+
+def to_html(marked):
+    """Escape highlighted text and turn the match markers into <mark> tags."""
+    if marked is None:
+        return None
+    return html.escape(marked).replace(START_MARK, '<mark>').replace(STOP_MARK, '</mark>')
@@ -2,9 +2,11 @@
 Serializers for Message model.
 """
 from rest_framework import serializers
-from .models import Message
+from .models import Conversation, Message
+from . import events, search
+from .conversations import record_message
 from apps.users.serializers import UserSerializer
-from apps.properties.serializers import PropertyListSerializer
+from apps.properties.serializers import PropertyListSerializer, PropertyRelatedListSerializer
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -19,6 +21,26 @@ class MessageSerializer(serializers.ModelSerializer):
         fields = ('id', 'property', 'property_detail', 'sender', 'recipient', 
                   'subject', 'content', 'is_read', 'sent_at', 'read_at')
         read_only_fields = ('id', 'sender', 'is_read', 'sent_at', 'read_at')
+        list_serializer_class = PropertyRelatedListSerializer
+
+
+class MessageSearchSerializer(MessageSerializer):
+    """Message search result with rank and highlighted text."""
+    
+    search_rank = serializers.FloatField(read_only=True)
+    subject_highlight = serializers.SerializerMethodField()
+    content_snippet = serializers.SerializerMethodField()
+    
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ('search_rank', 'subject_highlight', 'content_snippet')
+    
+    def get_subject_highlight(self, obj):
+        """Get the subject with matches wrapped in <mark>."""
+        return search.to_html(obj.subject_highlight)
+    
+    def get_content_snippet(self, obj):
+        """Get the best matching excerpt of the content."""
+        return search.to_html(obj.content_snippet)
 
 
 class MessageCreateSerializer(serializers.ModelSerializer):
@@ -54,4 +76,58 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         validated_data['recipient'] = property_obj.landlord
         validated_data['property'] = property_obj
         
-        return super().create(validated_data)
+        message = super().create(validated_data)
+        record_message(message)
+        events.message_sent(message)
+        return message
+
+
+class MarkReadSerializer(serializers.Serializer):
+    """Selection of messages to mark as read in bulk."""
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=500
+    )
+    conversation = serializers.IntegerField(required=False)
+    property_id = serializers.IntegerField(required=False)
+    up_to = serializers.IntegerField(required=False)
+    
+    def validate(self, attrs):
+        """Require exactly one of ids, conversation or property_id."""
+        scopes = [key for key in ('ids', 'conversation', 'property_id') if key in attrs]
+        if len(scopes) != 1:
+            raise serializers.ValidationError(
+                "Indiquez soit 'ids', soit 'conversation', soit 'property_id'."
+            )
+        if 'ids' in attrs and 'up_to' in attrs:
+            raise serializers.ValidationError(
+                "'up_to' ne s'utilise qu'avec 'conversation' ou 'property_id'."
+            )
+        return attrs
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """Lightweight serializer for the conversation list."""
+    
+    property = serializers.SerializerMethodField()
+    participant = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Conversation
+        fields = ('id', 'property', 'participant', 'last_message', 'last_message_snippet',
+                  'last_message_at', 'unread_count')
+    
+    def get_property(self, obj):
+        """Get property id and title."""
+        return {'id': obj.property_id, 'title': obj.property.title}
+    
+    def get_participant(self, obj):
+        """Get the other participant of the conversation."""
+        user = self.context['request'].user
+        other = obj.tenant if user.pk == obj.landlord_id else obj.landlord
+        return {'id': other.pk, 'full_name': other.get_full_name(), 'role': other.role}
+    
+    def get_unread_count(self, obj):
+        """Get unread messages of the current user."""
+        return getattr(obj, obj.unread_field(self.context['request'].user))
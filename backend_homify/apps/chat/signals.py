@@ -0,0 +1,25 @@
+"""
+Signal handlers keeping the message search index in sync.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import search
+from .models import Message
+
+SEARCH_FIELDS = {'subject', 'content'}
+
+
+@receiver(post_save, sender=Message)
+def index_message(sender, instance, update_fields=None, **kwargs):
+    """Reindex a message when its text changes."""
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(lambda: search.index_messages([instance.pk]))
+
+
+@receiver(post_delete, sender=Message)
+def unindex_message(sender, instance, **kwargs):
+    """Remove a deleted message from the search index."""
+    search.remove_messages([instance.pk])
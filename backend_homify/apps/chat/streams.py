@@ -0,0 +1,138 @@
+"""
+Server-Sent Events stream of chat events.
+
+Served by a raw ASGI application mounted in `rental_project.asgi` in front
+of Django: Django 4.2 does not watch for `http.disconnect` while streaming,
+so a stream served by a Django view would keep its Redis subscription open
+after the browser leaves. Here the relay and the disconnect watcher race,
+and the pub/sub connection is closed as soon as the client is gone.
+
+Browsers' EventSource cannot send headers, so the SimpleJWT access token is
+accepted either as `Authorization: Bearer` or as the `token` query
+parameter.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from .events import channel_for
+
+STREAM_PATH = '/api/messages/stream/'
+KEEPALIVE_SECONDS = getattr(settings, 'CHAT_STREAM_KEEPALIVE', 15)
+RETRY_MILLISECONDS = 3000
+
+
+def authenticate(scope):
+    """Return the user of the connection's access token, or None."""
+    authentication = JWTAuthentication()
+    headers = dict(scope.get('headers', []))
+    header = headers.get(b'authorization')
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        raw_token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if not raw_token:
+        return None
+
+    # Outside Django's request cycle: drop stale connections ourselves
+    close_old_connections()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return None
+    finally:
+        close_old_connections()
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def send_frame(send, frame):
+    await send({'type': 'http.response.body', 'body': frame.encode(), 'more_body': True})
+
+
+async def relay(user_id, send):
+    """Relay the user's pub/sub channel as SSE frames until cancelled."""
+    client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    pubsub = client.pubsub()
+    await pubsub.subscribe(channel_for(user_id))
+    try:
+        await send_frame(send, f'retry: {RETRY_MILLISECONDS}\n\n')
+        await send_frame(send, format_event('ready', {'user': user_id}))
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_SECONDS)
+            if message is None:
+                # Comment frame keeps proxies from closing an idle stream
+                await send_frame(send, ': keepalive\n\n')
+                continue
+            payload = json.loads(message['data'])
+            await send_frame(send, format_event(payload['event'], payload['data'], payload['data'].get('id')))
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await client.aclose()
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def message_stream(scope, receive, send):
+    """Stream new-message and read-receipt events of the authenticated user."""
+    user = await sync_to_async(authenticate)(scope)
+    if user is None:
+        await send({
+            'type': 'http.response.start',
+            'status': 401,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': json.dumps({'error': 'Authentification requise.'}).encode(),
+        })
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    relay_task = asyncio.ensure_future(relay(user.pk, send))
+    disconnect_task = asyncio.ensure_future(wait_for_disconnect(receive))
+    done, pending = await asyncio.wait({relay_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    # Let the relay unsubscribe and close its Redis connection
+    await asyncio.gather(*pending, return_exceptions=True)
+    if relay_task in done:
+        relay_task.result()
+
+
+def with_message_stream(application):
+    """Serve STREAM_PATH with message_stream and the rest with application."""
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+            return await message_stream(scope, receive, send)
+        return await application(scope, receive, send)
+    return router
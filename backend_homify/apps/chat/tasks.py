@@ -0,0 +1,11 @@
+"""
+Celery tasks for messages app.
+"""
+from celery import shared_task
+
+
+@shared_task
+def reconcile_unread_counts():
+    """Recount unread messages and correct the cached counters."""
+    from . import unread
+    return unread.reconcile()
@@ -0,0 +1,100 @@
+"""
+Unread message counter per user.
+
+Totals live in a Redis hash keyed by user id. A missing entry is seeded
+from the users' conversation counters, so reading a total never touches
+the message table. Sending and reading a message adjust entries that are
+already seeded after the transaction commits; the `reconcile_unread_counts`
+Celery task recounts everything from the messages to correct any drift.
+"""
+import logging
+
+import redis
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, When
+
+from rental_project.redis_client import get_redis
+
+from .models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+TOTALS_KEY = 'chat:unread'
+
+
+def conversation_total(user_id):
+    """Sum of a user's unread counters over their conversations."""
+    total = Conversation.objects.filter(Q(tenant_id=user_id) | Q(landlord_id=user_id)).aggregate(
+        total=Sum(Case(
+            When(landlord_id=user_id, then=F('landlord_unread')),
+            default=F('tenant_unread'),
+        ))
+    )['total']
+    return total or 0
+
+
+def get_count(user_id):
+    """Return the number of unread messages of a user."""
+    try:
+        client = get_redis()
+        cached = client.hget(TOTALS_KEY, user_id)
+        if cached is not None:
+            return max(int(cached), 0)
+        total = conversation_total(user_id)
+        client.hsetnx(TOTALS_KEY, user_id, total)
+        return total
+    except redis.RedisError:
+        return conversation_total(user_id)
+
+
+def adjust(user_id, delta):
+    """Add delta to a user's total once the current transaction commits."""
+    def apply():
+        try:
+            client = get_redis()
+            # Unseeded users are counted from their conversations on first read
+            if not client.hexists(TOTALS_KEY, user_id):
+                return
+            if client.hincrby(TOTALS_KEY, user_id, delta) < 0:
+                client.hset(TOTALS_KEY, user_id, 0)
+        except redis.RedisError:
+            logger.warning('Redis unavailable, unread count of user %s not updated.', user_id)
+
+    transaction.on_commit(apply)
+
+
+def set_count(user_id, total):
+    """Store a user's recounted total once the current transaction commits."""
+    def apply():
+        try:
+            get_redis().hset(TOTALS_KEY, user_id, total)
+        except redis.RedisError:
+            logger.warning('Redis unavailable, unread count of user %s not updated.', user_id)
+
+    transaction.on_commit(apply)
+
+
+def reconcile():
+    """
+    Recount unread messages from the message table.
+
+    Fixes the conversation counters first, then replaces the Redis totals.
+    Returns the number of users with unread messages.
+    """
+    from .conversations import recount_unread
+    recount_unread()
+
+    totals = dict(
+        Message.objects.filter(is_read=False).values('recipient')
+        .annotate(total=Count('pk')).values_list('recipient', 'total')
+    )
+    client = get_redis()
+    mapping = dict.fromkeys(client.hkeys(TOTALS_KEY), 0)
+    mapping.update({str(user_id): total for user_id, total in totals.items()})
+
+    pipe = client.pipeline()
+    pipe.delete(TOTALS_KEY)
+    if mapping:
+        pipe.hset(TOTALS_KEY, mapping=mapping)
+    pipe.execute()
+    return len(totals)
@@ -9,5 +9,6 @@ router = DefaultRouter()
 router.register(r'', MessageViewSet, basename='messages')
 
 urlpatterns = [
+    # Server-Sent Events on stream/ are served by rental_project.asgi
     path('', include(router.urls)),
 ]
@@ -7,11 +7,19 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from django.utils import timezone
-from .models import Message
-from .serializers import MessageSerializer, MessageCreateSerializer
+from .models import Conversation, Message
+from .serializers import (
+    MessageSerializer, MessageCreateSerializer, MessageSearchSerializer, ConversationSerializer,
+    MarkReadSerializer,
+)
+from . import events, search, unread
+from .conversations import mark_read, record_read
+from rental_project.instrumentation import InstrumentedViewMixin
 
+SEARCHABLE_ACTIONS = ('list', 'inbox', 'sent')
 
-class MessageViewSet(viewsets.ModelViewSet):
+
+class MessageViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """ViewSet for Message model."""
     
     permission_classes = (IsAuthenticated,)
@@ -19,14 +27,29 @@ class MessageViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Get messages for current user."""
         user = self.request.user
-        return Message.objects.filter(
+        queryset = Message.objects.filter(
             Q(sender=user) | Q(recipient=user)
-        ).select_related('sender', 'recipient', 'property')
+        ).select_related('sender', 'recipient', 'property__address')
+        
+        terms = self.search_terms()
+        if terms:
+            queryset = search.search_messages(queryset, terms, user)
+            if 'search_rank' in queryset.query.annotations:
+                queryset = queryset.order_by('-search_rank', '-sent_at')
+        return queryset
+    
+    def search_terms(self):
+        """Return the full-text query of a message list, if any."""
+        if self.action not in SEARCHABLE_ACTIONS:
+            return ''
+        return self.request.query_params.get('q', '').strip()
     
     def get_serializer_class(self):
         """Return appropriate serializer."""
         if self.action == 'create':
             return MessageCreateSerializer
+        if self.search_terms():
+            return MessageSearchSerializer
         return MessageSerializer
     
     @action(detail=False, methods=['get'])
@@ -42,6 +65,22 @@ class MessageViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(messages, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def conversations(self, request):
+        """Get conversations of the current user, most recent first."""
+        user = request.user
+        conversations = Conversation.objects.filter(
+            Q(tenant=user) | Q(landlord=user)
+        ).select_related('property', 'tenant', 'landlord').order_by('-last_message_at', '-id')
+        
+        page = self.paginate_queryset(conversations)
+        if page is not None:
+            serializer = ConversationSerializer(page, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = ConversationSerializer(conversations, many=True, context={'request': request})
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'])
     def sent(self, request):
         """Get sent messages."""
@@ -67,19 +106,58 @@ class MessageViewSet(viewsets.ModelViewSet):
             )
         
         if not message.is_read:
+            read_at = timezone.now()
+            # Conditional update: of two concurrent calls only one marks it
+            # and decrements the unread counters
+            marked = Message.objects.filter(pk=message.pk, is_read=False).update(
+                is_read=True, read_at=read_at
+            )
             message.is_read = True
-            message.read_at = timezone.now()
-            message.save()
+            if marked:
+                message.read_at = read_at
+                record_read(message)
+                events.message_read(message)
+            else:
+                message.refresh_from_db(fields=['read_at'])
         
         serializer = self.get_serializer(message)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """Mark several received messages as read at once."""
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if 'ids' in data:
+            messages = Message.objects.filter(pk__in=data['ids'])
+        else:
+            if 'conversation' in data:
+                messages = Message.objects.filter(conversation_id=data['conversation'])
+            else:
+                messages = Message.objects.filter(property_id=data['property_id'])
+            if 'up_to' in data:
+                messages = messages.filter(pk__lte=data['up_to'])
+        
+        read_at, rows = mark_read(request.user, messages)
+        events.messages_read(rows, read_at)
+        
+        conversation_ids = {conversation_id for _, conversation_id, _ in rows if conversation_id}
+        conversations = Conversation.objects.filter(pk__in=conversation_ids)
+        return Response({
+            'updated': len(rows),
+            'read_at': read_at,
+            'unread_count': unread.get_count(request.user.pk),
+            'conversations': [
+                {'id': conversation.pk, 'unread_count': getattr(conversation, conversation.unread_field(request.user))}
+                for conversation in conversations
+            ],
+        })
+    
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread messages."""
-        count = Message.objects.filter(
-            recipient=request.user,
-            is_read=False
-        ).count()
+        count = unread.get_count(request.user.pk)
         
         return Response({'unread_count': count})
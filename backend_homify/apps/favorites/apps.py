@@ -0,0 +1,14 @@
+"""
+App configuration for favorites app.
+"""
+from django.apps import AppConfig
+
+
+class FavoritesConfig(AppConfig):
+    """Configuration for favorites app."""
+    
+    name = 'apps.favorites'
+    verbose_name = 'Favoris'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,79 @@
+"""
+Bulk favorite operations.
+
+Adds are one `bulk_create(ignore_conflicts=True)` and removals one
+filtered delete, whatever the number of properties. `bulk_create` sends no
+signals, so the cached set and the listing analytics are updated here.
+Every operation locks the user's row and diffs against the favorite
+table itself: `ignore_conflicts` does not report which rows were
+inserted, and the cached set may be stale. The cache is only updated
+here, never read.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.properties import analytics
+from apps.properties.models import Property
+
+from . import cache
+from .models import Favorite
+
+MAX_PROPERTY_IDS = 500
+
+
+def _publishable(property_ids):
+    return set(Property.objects.filter(
+        pk__in=property_ids, status='PUBLISHED'
+    ).values_list('pk', flat=True))
+
+
+def _lock_user(user):
+    """Serialize the favorite changes of a user; call inside a transaction."""
+    get_user_model().objects.select_for_update().get(pk=user.pk)
+
+
+def add_favorites(user, property_ids):
+    """Favorite the published properties among property_ids; return the new ones."""
+    candidates = _publishable(set(property_ids))
+    if not candidates:
+        return []
+
+    with transaction.atomic():
+        _lock_user(user)
+        favorites = Favorite.objects.filter(user=user, property_id__in=candidates)
+        existing = set(favorites.values_list('property_id', flat=True))
+        Favorite.objects.bulk_create(
+            [Favorite(user=user, property_id=property_id) for property_id in candidates - existing],
+            ignore_conflicts=True,
+        )
+        added = sorted(set(favorites.values_list('property_id', flat=True)) - existing)
+        cache.add(user.pk, candidates)
+    for property_id in added:
+        analytics.record_event(property_id, 'favorites')
+    return added
+
+
+def remove_favorites(user, property_ids):
+    """Unfavorite property_ids; return the ones that were favorites."""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return []
+
+    with transaction.atomic():
+        _lock_user(user)
+        favorites = Favorite.objects.filter(user=user, property_id__in=property_ids)
+        removed = sorted(favorites.values_list('property_id', flat=True))
+        # The delete signals update the cached set
+        favorites.delete()
+    return removed
+
+
+def sync_favorites(user, property_ids):
+    """Make the user's favorites match property_ids; unpublished ones are not added."""
+    wanted = set(property_ids)
+    with transaction.atomic():
+        _lock_user(user)
+        current = set(Favorite.objects.filter(user=user).values_list('property_id', flat=True))
+        removed = remove_favorites(user, current - wanted)
+        added = add_favorites(user, wanted - current)
+    return added, removed
@@ -0,0 +1,120 @@
+"""
+Per-user set of favorite property ids.
+
+Each user's favorites are mirrored in a Redis set, loaded from the
+database on first use and kept current by the favorite signals and the
+bulk operations. Serializers check a whole page with one SMISMEMBER
+instead of querying the favorite table. The set holds a sentinel member
+so that a user without favorites is still cached.
+
+Every change bumps a per-user version before touching the set. A load
+reads the version before its database snapshot and installs the set only
+if the version is unchanged when it writes (WATCH), so a snapshot that
+missed a concurrent change is discarded rather than cached.
+"""
+import logging
+
+import redis
+from django.db import transaction
+
+from rental_project.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+SET_KEY = 'favorites:user:{}'
+VERSION_KEY = 'favorites:user:{}:version'
+SENTINEL = '-'
+TIMEOUT = 24 * 3600
+
+
+def _key(user_id):
+    return SET_KEY.format(user_id)
+
+
+def _load(client, user_id):
+    """Fill a user's set from the database and return the favorite ids."""
+    from .models import Favorite
+    version_key = VERSION_KEY.format(user_id)
+    version = client.get(version_key)
+    ids = set(Favorite.objects.filter(user_id=user_id).values_list('property_id', flat=True))
+
+    with client.pipeline() as pipe:
+        try:
+            pipe.watch(version_key)
+            if pipe.get(version_key) != version:
+                # Changed since the snapshot: leave the set to the next load
+                return ids
+            pipe.multi()
+            pipe.delete(_key(user_id))
+            pipe.sadd(_key(user_id), SENTINEL, *ids)
+            pipe.expire(_key(user_id), TIMEOUT)
+            pipe.execute()
+        except redis.WatchError:
+            pass
+    return ids
+
+
+def favorite_ids(user_id, property_ids=None):
+    """
+    Return the user's favorite property ids.
+
+    When property_ids is given, only those of them that are favorites.
+    """
+    from .models import Favorite
+
+    try:
+        client = get_redis()
+        if property_ids is None:
+            members = client.smembers(_key(user_id))
+            if not members:
+                return _load(client, user_id)
+            return {int(member) for member in members if member != SENTINEL}
+
+        property_ids = list(property_ids)
+        if not property_ids:
+            return set()
+        flags = client.smismember(_key(user_id), [SENTINEL, *property_ids])
+        if not flags[0]:
+            return _load(client, user_id).intersection(property_ids)
+        return {pk for pk, flag in zip(property_ids, flags[1:]) if flag}
+    except redis.RedisError:
+        favorites = Favorite.objects.filter(user_id=user_id)
+        if property_ids is not None:
+            favorites = favorites.filter(property_id__in=property_ids)
+        return set(favorites.values_list('property_id', flat=True))
+
+
+def _update(user_id, added=(), removed=()):
+    """Apply changes to a cached set after commit; uncached sets are left alone."""
+    added, removed = list(added), list(removed)
+    if not added and not removed:
+        return
+
+    def apply():
+        try:
+            client = get_redis()
+            # Bumped first, so that a load racing this change is discarded
+            pipe = client.pipeline()
+            pipe.incr(VERSION_KEY.format(user_id))
+            pipe.expire(VERSION_KEY.format(user_id), TIMEOUT)
+            pipe.execute()
+            if not client.sismember(_key(user_id), SENTINEL):
+                return
+            pipe = client.pipeline()
+            if added:
+                pipe.sadd(_key(user_id), *added)
+            if removed:
+                pipe.srem(_key(user_id), *removed)
+            pipe.execute()
+        except redis.RedisError:
+            logger.warning('Redis unavailable, favorites cache of user %s not updated.', user_id)
+
+    transaction.on_commit(apply)
+
+
+def add(user_id, property_ids):
+    _update(user_id, added=property_ids)
+
+
+def remove(user_id, property_ids):
+    _update(user_id, removed=property_ids)
@@ -28,6 +28,9 @@ class Favorite(models.Model):
         verbose_name_plural = 'Favoris'
         unique_together = ('user', 'property')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.property.title}"
@@ -2,8 +2,9 @@
 Serializers for Favorite model.
 """
 from rest_framework import serializers
+from .bulk import MAX_PROPERTY_IDS
 from .models import Favorite
-from apps.properties.serializers import PropertyListSerializer
+from apps.properties.serializers import PropertyListSerializer, PropertyRelatedListSerializer
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
@@ -16,8 +17,18 @@ class FavoriteSerializer(serializers.ModelSerializer):
         model = Favorite
         fields = ('id', 'property', 'property_id', 'created_at')
         read_only_fields = ('id', 'created_at')
+        list_serializer_class = PropertyRelatedListSerializer
     
     def create(self, validated_data):
         """Create favorite."""
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class FavoriteBulkSerializer(serializers.Serializer):
+    """Bulk add, remove or sync of favorite properties."""
+    
+    action = serializers.ChoiceField(choices=('add', 'remove', 'sync'))
+    property_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=True, max_length=MAX_PROPERTY_IDS
+    )
@@ -0,0 +1,21 @@
+"""
+Signal handlers keeping the cached favorite sets in sync.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache
+from .models import Favorite
+
+
+@receiver(post_save, sender=Favorite)
+def cache_favorite(sender, instance, created, **kwargs):
+    """Add a new favorite to its user's cached set."""
+    if created:
+        cache.add(instance.user_id, [instance.property_id])
+
+
+@receiver(post_delete, sender=Favorite)
+def uncache_favorite(sender, instance, **kwargs):
+    """Remove a deleted favorite from its user's cached set."""
+    cache.remove(instance.user_id, [instance.property_id])
@@ -6,11 +6,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Favorite
-from .serializers import FavoriteSerializer
+from .bulk import add_favorites, remove_favorites, sync_favorites
+from .serializers import FavoriteSerializer, FavoriteBulkSerializer
 from apps.properties.models import Property
+from rental_project.instrumentation import InstrumentedViewMixin
 
 
-class FavoriteViewSet(viewsets.ModelViewSet):
+class FavoriteViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """ViewSet for Favorite model."""
     
     serializer_class = FavoriteSerializer
@@ -18,7 +20,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Get current user's favorites."""
-        return Favorite.objects.filter(user=self.request.user).select_related('property')
+        return Favorite.objects.filter(user=self.request.user).select_related('property__address')
     
     def create(self, request, *args, **kwargs):
         """Add property to favorites."""
@@ -50,6 +52,30 @@ class FavoriteViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Add, remove or sync a list of favorite properties."""
+        serializer = FavoriteBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operation = serializer.validated_data['action']
+        property_ids = serializer.validated_data['property_ids']
+        
+        added, removed = [], []
+        if operation == 'add':
+            added = add_favorites(request.user, property_ids)
+        elif operation == 'remove':
+            removed = remove_favorites(request.user, property_ids)
+        else:
+            added, removed = sync_favorites(request.user, property_ids)
+        
+        return Response({
+            'added': added,
+            'removed': removed,
+            'favorite_ids': sorted(
+                Favorite.objects.filter(user=request.user).values_list('property_id', flat=True)
+            ),
+        })
+    
     @action(detail=False, methods=['delete'], url_path='(?P<property_id>[^/.]+)')
     def remove_by_property(self, request, property_id=None):
         """Remove property from favorites by property ID."""
@@ -0,0 +1,67 @@
+"""
+Amenity bitmask of properties.
+
+Amenity `n` is stored as bit `n - 1` of `Property.amenity_mask`, so
+"has all of these amenities" is the single predicate
+`amenity_mask & wanted = wanted` instead of one join per amenity. Ids
+above `MAX_MASK_ID` do not fit the signed 64-bit column and fall back to
+joins. Masks are refreshed by the amenity link signals in `signals.py`.
+"""
+from django.apps import apps as global_apps
+from django.db.models import F, Subquery
+
+MAX_MASK_ID = 63
+
+
+def split_ids(amenity_ids):
+    """Return (mask, overflow ids) for a set of amenity ids."""
+    mask = 0
+    overflow = []
+    for amenity_id in set(amenity_ids):
+        if 1 <= amenity_id <= MAX_MASK_ID:
+            mask |= 1 << (amenity_id - 1)
+        else:
+            overflow.append(amenity_id)
+    return mask, sorted(overflow)
+
+
+def compute_masks(property_ids, apps=global_apps):
+    """Return {property_id: mask} from the amenity links."""
+    Property = apps.get_model('properties', 'Property')
+    masks = {property_id: 0 for property_id in property_ids}
+    links = Property.amenities.through.objects.filter(
+        property_id__in=list(property_ids), amenity_id__lte=MAX_MASK_ID
+    )
+    for property_id, amenity_id in links.values_list('property_id', 'amenity_id'):
+        masks[property_id] |= 1 << (amenity_id - 1)
+    return masks
+
+
+def refresh_masks(property_ids, apps=global_apps):
+    """Recompute and store the masks of the given properties."""
+    Property = apps.get_model('properties', 'Property')
+    masks = compute_masks(property_ids, apps)
+    properties = [Property(pk=property_id, amenity_mask=mask) for property_id, mask in masks.items()]
+    # bulk_update does not send save signals: only the mask changed
+    Property.objects.bulk_update(properties, ['amenity_mask'], batch_size=500)
+    return len(properties)
+
+
+def filter_queryset(queryset, amenity_ids, mask_field='amenity_mask', property_field='pk'):
+    """Keep the rows having every amenity of amenity_ids."""
+    from .models import Property
+
+    mask, overflow = split_ids(amenity_ids)
+    if mask:
+        queryset = queryset.alias(
+            amenities_matched=F(mask_field).bitand(mask)
+        ).filter(amenities_matched=mask)
+
+    links = Property.amenities.through.objects
+    for amenity_id in overflow:
+        queryset = queryset.filter(**{
+            f'{property_field}__in': Subquery(
+                links.filter(amenity_id=amenity_id).values('property_id')
+            )
+        })
+    return queryset
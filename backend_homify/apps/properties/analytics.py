@@ -0,0 +1,177 @@
+"""
+Landlord analytics.
+
+Views, favorites and messages are counted per listing in hourly and daily
+buckets. Events are buffered in a Redis hash keyed by property, event and
+hour, and written in batches by the `flush_property_analytics` Celery
+task: one read of the affected buckets and one upsert per table. Bucket
+rows carry the landlord id so a dashboard is a single indexed range scan.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from rental_project.redis_client import exclusive, get_redis
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'properties:analytics:pending'
+FLUSHING_KEY = 'properties:analytics:flushing'
+FLUSH_LOCK_KEY = 'properties:analytics:flush-lock'
+
+EVENTS = ('views', 'favorites', 'messages')
+
+HOURLY_RETENTION_DAYS = getattr(settings, 'ANALYTICS_HOURLY_RETENTION_DAYS', 30)
+
+
+def hour_of(moment):
+    """Return the UTC hour bucket containing a datetime."""
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def record_event(property_id, event, moment=None):
+    """Buffer one event of a listing."""
+    hour = hour_of(moment or timezone.now())
+    field = f'{property_id}:{event}:{int(hour.timestamp())}'
+    try:
+        get_redis().hincrby(PENDING_KEY, field, 1)
+    except redis.RedisError:
+        logger.warning('Redis unavailable, writing %s of property %s directly.', event, property_id)
+        write_counts({(int(property_id), event, hour): 1})
+
+
+def write_counts(counts):
+    """
+    Add {(property_id, event, hour): count} to the bucket tables.
+
+    Returns the number of events written.
+    """
+    from .models import DailyActivity, HourlyActivity, Property
+
+    property_ids = {property_id for property_id, _, _ in counts}
+    landlords = dict(Property.objects.filter(pk__in=property_ids).values_list('pk', 'landlord_id'))
+
+    hourly = defaultdict(lambda: dict.fromkeys(EVENTS, 0))
+    daily = defaultdict(lambda: dict.fromkeys(EVENTS, 0))
+    for (property_id, event, hour), count in counts.items():
+        if property_id not in landlords or event not in EVENTS:
+            # Deleted listing or unknown event
+            continue
+        hourly[(property_id, hour)][event] += count
+        daily[(property_id, timezone.localtime(hour).date())][event] += count
+
+    with transaction.atomic():
+        _upsert(HourlyActivity, hourly, landlords)
+        _upsert(DailyActivity, daily, landlords)
+    return sum(sum(values.values()) for values in hourly.values())
+
+
+def _upsert(model, increments, landlords):
+    """Add increments to existing buckets and create the missing ones."""
+    if not increments:
+        return
+
+    existing = {
+        (row.property_id, row.bucket): row
+        for row in model.objects.select_for_update().filter(
+            property_id__in={property_id for property_id, _ in increments},
+            bucket__in={bucket for _, bucket in increments},
+        )
+    }
+
+    rows = []
+    for (property_id, bucket), values in increments.items():
+        row = existing.get((property_id, bucket)) or model(
+            property_id=property_id, landlord_id=landlords[property_id], bucket=bucket
+        )
+        for event, count in values.items():
+            setattr(row, event, getattr(row, event) + count)
+        rows.append(row)
+
+    model.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['property', 'bucket'],
+        update_fields=list(EVENTS),
+    )
+
+
+def flush_events():
+    """
+    Move buffered events to the bucket tables.
+
+    Same protocol as the view counter: the pending hash is renamed so that
+    new events land in a fresh one, a hash left by an interrupted run is
+    applied first, and an overlapping run returns without applying
+    anything. Returns the number of events written.
+    """
+    with exclusive(FLUSH_LOCK_KEY) as acquired:
+        if not acquired:
+            return 0
+        return _flush_events()
+
+
+def _flush_events():
+    client = get_redis()
+    if not client.exists(FLUSHING_KEY):
+        try:
+            client.rename(PENDING_KEY, FLUSHING_KEY)
+        except redis.ResponseError:
+            return 0
+
+    counts = {}
+    for field, count in client.hgetall(FLUSHING_KEY).items():
+        property_id, event, timestamp = field.split(':')
+        hour = datetime.fromtimestamp(int(timestamp), tz=dt_timezone.utc)
+        counts[(int(property_id), event, hour)] = int(count)
+
+    written = write_counts(counts)
+    client.delete(FLUSHING_KEY)
+    return written
+
+
+def purge_hourly(days=HOURLY_RETENTION_DAYS):
+    """Delete hourly buckets older than the retention period."""
+    from .models import HourlyActivity
+    deleted, _ = HourlyActivity.objects.filter(
+        bucket__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+def landlord_series(landlord, granularity, start, end, property_id=None):
+    """
+    Return the time series of a landlord's listings between start and end.
+
+    Buckets without activity are omitted.
+    """
+    from .models import DailyActivity, HourlyActivity, Property
+
+    model = HourlyActivity if granularity == 'hour' else DailyActivity
+    rows = model.objects.filter(landlord=landlord, bucket__gte=start, bucket__lte=end)
+    if property_id is not None:
+        rows = rows.filter(property_id=property_id)
+
+    series = defaultdict(list)
+    for row in rows.order_by('bucket').values('property_id', 'bucket', *EVENTS):
+        series[row.pop('property_id')].append(row)
+
+    properties = Property.objects.filter(landlord=landlord)
+    if property_id is not None:
+        properties = properties.filter(pk=property_id)
+
+    result = []
+    for pk, title in properties.order_by('-created_at').values_list('pk', 'title'):
+        points = series.get(pk, [])
+        result.append({
+            'id': pk,
+            'title': title,
+            'totals': {event: sum(point[event] for point in points) for event in EVENTS},
+            'series': points,
+        })
+    return result
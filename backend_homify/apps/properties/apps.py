@@ -0,0 +1,14 @@
+"""
+App configuration for properties app.
+"""
+from django.apps import AppConfig
+
+
+class PropertiesConfig(AppConfig):
+    """Configuration for properties app."""
+    
+    name = 'apps.properties'
+    verbose_name = 'Propriétés'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
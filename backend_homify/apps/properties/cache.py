@@ -0,0 +1,142 @@
+"""
+Shared response cache for anonymous property listings.
+
+Anonymous `list` and `retrieve` responses are stored as rendered JSON,
+keyed on the normalized query parameters. Keys embed a version number:
+list entries use a global generation, detail entries a per-property
+version. Bumping these versions on change makes stale entries unreachable
+without scanning the cache.
+
+The cache is an optimization only: when the backend is unreachable,
+responses are rendered uncached and invalidations are skipped.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'properties:cache:generation'
+VERSION_KEY = 'properties:cache:version:{}'
+HITS_KEY = 'properties:cache:hits'
+MISSES_KEY = 'properties:cache:misses'
+
+# Parameters whose empty value is meaningful
+KEEP_EMPTY_PARAMS = {'cursor'}
+
+
+def cache_timeout():
+    return getattr(settings, 'PROPERTY_CACHE_TIMEOUT', 300)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a lost key never reuses an old version
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def _store(key, content):
+    try:
+        cache.set(key, content, cache_timeout())
+    except Exception:
+        logger.warning('Cache unavailable, response %s not stored.', key)
+
+
+def normalize_params(query_params):
+    """Return query parameters as a sorted list, without no-op values."""
+    params = []
+    for name, values in query_params.lists():
+        values = sorted(value for value in values if value or name in KEEP_EMPTY_PARAMS)
+        if not values or (name == 'page' and values == ['1']):
+            continue
+        params.append((name, values))
+    return sorted(params)
+
+
+def build_key(action, query_params, pk=None):
+    """Build the cache key of an anonymous response."""
+    if pk is None:
+        version = _get_version(GENERATION_KEY)
+    else:
+        version = _get_version(VERSION_KEY.format(pk))
+    digest = hashlib.sha1(json.dumps(normalize_params(query_params)).encode()).hexdigest()
+    return f'properties:cache:{action}:{pk or ""}:{version}:{digest}'
+
+
+def cached_response(request, action, render, pk=None):
+    """
+    Serve an anonymous request from the cache, or render and store it.
+
+    `render` returns the DRF response to cache on a miss.
+    """
+    if request.user.is_authenticated:
+        return render()
+
+    try:
+        key = build_key(action, request.query_params, pk)
+        content = cache.get(key)
+        _count(HITS_KEY if content is not None else MISSES_KEY)
+    except Exception:
+        logger.warning('Cache unavailable, rendering %s uncached.', action)
+        return render()
+
+    if content is not None:
+        response = HttpResponse(content, content_type='application/json')
+        response['X-Cache'] = 'HIT'
+        return response
+
+    response = render()
+    response['X-Cache'] = 'MISS'
+    if response.status_code == 200:
+        response.add_post_render_callback(
+            lambda rendered: _store(key, rendered.rendered_content)
+        )
+    return response
+
+
+def invalidate(property_ids=(), lists=True):
+    """Make cached responses involving the given properties unreachable."""
+    try:
+        if lists:
+            _bump_version(GENERATION_KEY)
+        for property_id in property_ids:
+            _bump_version(VERSION_KEY.format(property_id))
+    except Exception:
+        logger.warning('Cache unavailable, invalidation of properties %s skipped.', list(property_ids))
+
+
+def get_stats():
+    """Return hit/miss counters of the response cache."""
+    try:
+        hits = cache.get(HITS_KEY) or 0
+        misses = cache.get(MISSES_KEY) or 0
+    except Exception:
+        hits = misses = 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,104 @@
+"""
+Write-behind view counter for properties.
+
+Views are accumulated in a Redis hash and flushed to the database in
+batches by the `flush_property_views` Celery task. When Redis is not
+reachable the view is written directly with an atomic F() update.
+
+Only the detail view adds the views still buffered to `view_count`;
+listings ordered by `view_count` use the flushed counts, which lag by at
+most one flush interval.
+"""
+import logging
+from collections import defaultdict
+
+import redis
+from django.db import transaction
+from django.db.models import F
+
+from rental_project.redis_client import exclusive, get_redis
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'properties:views:pending'
+FLUSHING_KEY = 'properties:views:flushing'
+FLUSH_LOCK_KEY = 'properties:views:flush-lock'
+
+
+def record_view(property_id):
+    """Buffer one view of a property."""
+    from . import analytics
+    analytics.record_event(property_id, 'views')
+    try:
+        get_redis().hincrby(PENDING_KEY, property_id, 1)
+    except redis.RedisError:
+        logger.warning('Redis unavailable, writing view of property %s directly.', property_id)
+        from .models import Property
+        Property.objects.filter(pk=property_id).update(view_count=F('view_count') + 1)
+
+
+def pending_views(property_ids):
+    """Return {property_id: views not yet flushed} for the given ids."""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return {}
+    
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hmget(PENDING_KEY, property_ids)
+        pipe.hmget(FLUSHING_KEY, property_ids)
+        pending, flushing = pipe.execute()
+    except redis.RedisError:
+        return {}
+    
+    return {
+        property_id: int(waiting or 0) + int(in_flight or 0)
+        for property_id, waiting, in_flight in zip(property_ids, pending, flushing)
+        if waiting or in_flight
+    }
+
+
+def flush_views():
+    """
+    Move buffered views to the database.
+    
+    The pending hash is renamed before being applied so that views recorded
+    during the flush land in a fresh hash. A flushing hash left behind by
+    an interrupted run is applied first. Runs are serialized by a lock, so
+    an overlapping run returns instead of applying the same hash twice.
+    Returns the number of views written.
+    """
+    with exclusive(FLUSH_LOCK_KEY) as acquired:
+        if not acquired:
+            return 0
+        return _flush_views()
+
+
+def _flush_views():
+    from .models import Property
+    
+    client = get_redis()
+    if not client.exists(FLUSHING_KEY):
+        try:
+            client.rename(PENDING_KEY, FLUSHING_KEY)
+        except redis.ResponseError:
+            # Nothing buffered since the last flush
+            return 0
+    
+    counts = client.hgetall(FLUSHING_KEY)
+    
+    # One UPDATE per distinct delta keeps the batch small on hot listings
+    ids_by_delta = defaultdict(list)
+    for property_id, delta in counts.items():
+        ids_by_delta[int(delta)].append(int(property_id))
+    
+    with transaction.atomic():
+        for delta, ids in ids_by_delta.items():
+            Property.objects.filter(pk__in=ids).update(view_count=F('view_count') + delta)
+    
+    client.delete(FLUSHING_KEY)
+    
+    # Cached detail pages embed the flushed counts
+    from . import cache
+    cache.invalidate([int(property_id) for property_id in counts], lists=False)
+    return sum(delta * len(ids) for delta, ids in ids_by_delta.items())
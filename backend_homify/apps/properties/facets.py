@@ -0,0 +1,102 @@
+"""
+Facet counts for the property filter UI.
+
+Every facet is computed from a single grouped query over the filtered
+published properties: rows are grouped on the combination of all facet
+columns, and the per-facet counts are summed from these groups in Python.
+Results are cached per normalized filter set under the list generation of
+the response cache, so any listing change makes them unreachable.
+"""
+from django.core.cache import cache as django_cache
+from django.db.models import Case, CharField, Count, Value, When
+
+from . import cache
+
+# (label, lower bound included, upper bound excluded) in FCFA per month
+PRICE_BUCKETS = [
+    ('0-50000', 0, 50000),
+    ('50000-100000', 50000, 100000),
+    ('100000-200000', 100000, 200000),
+    ('200000-500000', 200000, 500000),
+    ('500000+', 500000, None),
+]
+
+FACETS = {
+    'type': 'type',
+    'furnished': 'furnished',
+    'city': 'address__city',
+    'district': 'address__district',
+    'bedrooms': 'number_of_bedrooms',
+    'price': 'price_bucket',
+}
+
+# Parameters that change the page, not the result set
+IGNORED_PARAMS = {'page', 'page_size', 'cursor', 'count', 'sort', 'ordering'}
+
+
+def price_bucket_expression():
+    whens = []
+    for label, low, high in PRICE_BUCKETS:
+        condition = {'monthly_rent__gte': low}
+        if high is not None:
+            condition['monthly_rent__lt'] = high
+        whens.append(When(**condition, then=Value(label)))
+    return Case(*whens, output_field=CharField())
+
+
+def compute_facets(queryset):
+    """Return {'count': total, 'facets': {...}} for a filtered queryset."""
+    groups = (
+        queryset.order_by()
+        .annotate(price_bucket=price_bucket_expression())
+        .values(*FACETS.values())
+        .annotate(total=Count('id'))
+    )
+
+    counts = {name: {} for name in FACETS}
+    total = 0
+    for group in groups:
+        total += group['total']
+        for name, column in FACETS.items():
+            value = group[column]
+            if value is None or value == '':
+                continue
+            counts[name][value] = counts[name].get(value, 0) + group['total']
+
+    facets = {}
+    for name, values in counts.items():
+        if name == 'price':
+            facets[name] = [
+                {'value': label, 'min': low, 'max': high, 'count': values.get(label, 0)}
+                for label, low, high in PRICE_BUCKETS
+            ]
+        elif name in ('furnished', 'bedrooms'):
+            facets[name] = [{'value': value, 'count': count} for value, count in sorted(values.items())]
+        else:
+            facets[name] = [
+                {'value': value, 'count': count}
+                for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0]))
+            ]
+    return {'count': total, 'facets': facets}
+
+
+def get_facets(queryset, query_params):
+    """Return the facets of a filter set, from the cache when possible."""
+    params = query_params.copy()
+    for name in IGNORED_PARAMS:
+        params.pop(name, None)
+
+    try:
+        key = cache.build_key('facets', params)
+        result = django_cache.get(key)
+    except Exception:
+        # Cache unavailable: compute without storing
+        return compute_facets(queryset)
+
+    if result is None:
+        result = compute_facets(queryset)
+        try:
+            django_cache.set(key, result, cache.cache_timeout())
+        except Exception:
+            pass
+    return result
@@ -2,7 +2,18 @@
 Filters for properties.
 """
 import django_filters
-from .models import Property
+from django.db.models import Q
+from rest_framework import filters, serializers
+from . import amenity_mask, geo, search
+from .models import Property, PropertySearchIndex
+
+
+def parse_amenity_ids(value):
+    """Parse `1,4,7` into a list of amenity ids."""
+    try:
+        return [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise serializers.ValidationError({'amenities': 'Format attendu : identifiants séparés par des virgules.'})
 
 
 class PropertyFilter(django_filters.FilterSet):
@@ -13,7 +24,131 @@ class PropertyFilter(django_filters.FilterSet):
     min_surface = django_filters.NumberFilter(field_name='surface', lookup_expr='gte')
     city = django_filters.CharFilter(field_name='address__city', lookup_expr='icontains')
     district = django_filters.CharFilter(field_name='address__district', lookup_expr='icontains')
+    lat = django_filters.NumberFilter(method='filter_geo', label='Latitude')
+    lng = django_filters.NumberFilter(method='filter_geo', label='Longitude')
+    radius_km = django_filters.NumberFilter(method='filter_geo', label='Rayon (km)')
+    bbox = django_filters.CharFilter(method='filter_geo', label='min_lng,min_lat,max_lng,max_lat')
+    amenities = django_filters.CharFilter(method='filter_amenities', label='Équipements (ids séparés par des virgules)')
     
     class Meta:
         model = Property
         fields = ['type', 'furnished', 'number_of_rooms', 'number_of_bedrooms']
+    
+    def filter_amenities(self, queryset, name, value):
+        """Keep properties having all the listed amenities."""
+        return amenity_mask.filter_queryset(queryset, parse_amenity_ids(value))
+    
+    def filter_geo(self, queryset, name, value):
+        """Geographic parameters are applied together in `filter_queryset`."""
+        return queryset
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        lat, lng, radius = data.get('lat'), data.get('lng'), data.get('radius_km')
+        
+        if (lat is None) != (lng is None):
+            raise serializers.ValidationError({'lat': 'lat et lng doivent être fournis ensemble.'})
+        if radius is not None and lat is None:
+            raise serializers.ValidationError({'radius_km': 'radius_km nécessite lat et lng.'})
+        
+        if data.get('bbox'):
+            queryset = self.filter_box(queryset, *self.parse_bbox(data['bbox']))
+        
+        if lat is not None:
+            lat, lng = float(lat), float(lng)
+            if radius is not None:
+                radius = float(radius)
+                if radius <= 0:
+                    raise serializers.ValidationError({'radius_km': 'Le rayon doit être positif.'})
+                queryset = self.filter_box(queryset, *geo.bounding_box(lat, lng, radius))
+            
+            queryset = queryset.annotate(distance_km=geo.distance_expression(
+                lat, lng, 'address__latitude', 'address__longitude'
+            ))
+            if radius is not None:
+                queryset = queryset.filter(distance_km__lte=radius)
+        
+        return queryset
+    
+    def parse_bbox(self, value):
+        """Parse `min_lng,min_lat,max_lng,max_lat` into (min_lat, min_lng, max_lat, max_lng)."""
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+        except ValueError:
+            raise serializers.ValidationError({'bbox': 'Format attendu : min_lng,min_lat,max_lng,max_lat.'})
+        
+        if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+            raise serializers.ValidationError({'bbox': 'Coordonnées invalides.'})
+        return min_lat, min_lng, max_lat, max_lng
+    
+    def filter_box(self, queryset, min_lat, min_lng, max_lat, max_lng):
+        """Narrow to the geohash cells covering the box, then to the box itself."""
+        cells = Q()
+        for cell in geo.covering_geohashes(min_lat, min_lng, max_lat, max_lng):
+            cells |= Q(address__geohash__startswith=cell)
+        
+        return queryset.filter(
+            cells,
+            address__latitude__range=(min_lat, max_lat),
+            address__longitude__range=(min_lng, max_lng),
+        )
+
+
+class PropertySearchIndexFilter(django_filters.FilterSet):
+    """`PropertyFilter` parameters answered by the denormalized listing table."""
+    
+    min_price = django_filters.NumberFilter(field_name='monthly_rent', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='monthly_rent', lookup_expr='lte')
+    min_surface = django_filters.NumberFilter(field_name='surface', lookup_expr='gte')
+    city = django_filters.CharFilter(field_name='city', lookup_expr='icontains')
+    district = django_filters.CharFilter(field_name='district', lookup_expr='icontains')
+    type = django_filters.ChoiceFilter(choices=Property.TYPE_CHOICES)
+    amenities = django_filters.CharFilter(method='filter_amenities')
+    
+    class Meta:
+        model = PropertySearchIndex
+        fields = ['type', 'furnished', 'number_of_rooms', 'number_of_bedrooms']
+    
+    def filter_amenities(self, queryset, name, value):
+        return amenity_mask.filter_queryset(queryset, parse_amenity_ids(value), property_field='id')
+
+
+class PropertySearchFilter(filters.SearchFilter):
+    """Search filter backed by the property full-text index."""
+    
+    def filter_queryset(self, request, queryset, view):
+        terms = ' '.join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+        
+        if not search.is_supported():
+            return super().filter_queryset(request, queryset, view)
+        
+        return search.search_properties(queryset, terms)
+
+
+class PropertyOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering filter adding `sort=relevance` for full-text searches and
+    `sort=distance` for geographic searches.
+    
+    Results of a search around a point are sorted by distance unless
+    another ordering is requested.
+    """
+    
+    sort_param = 'sort'
+    
+    def filter_queryset(self, request, queryset, view):
+        sort = request.query_params.get(self.sort_param)
+        annotations = queryset.query.annotations
+        
+        if sort == 'relevance' and 'search_rank' in annotations:
+            return queryset.order_by('-search_rank', '-created_at')
+        
+        if 'distance_km' in annotations and (
+            sort == 'distance' or (sort is None and self.ordering_param not in request.query_params)
+        ):
+            return queryset.order_by('distance_km', '-created_at')
+        
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,101 @@
+"""
+Geospatial helpers for property search.
+
+Addresses store a geohash of their coordinates in an indexed column. A
+radius or bounding-box query is first narrowed to the handful of geohash
+cells covering the area (prefix scans on the B-tree index), then refined
+with the exact haversine distance computed in SQL.
+"""
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Upper bound on the number of cells (OR-ed prefix scans) per query
+MAX_COVERING_CELLS = 16
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode coordinates as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        value, interval = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+
+def geohash_cell_size(precision):
+    """Return (lat_degrees, lng_degrees) covered by one cell at precision."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, min_lng, max_lat, max_lng) enclosing a circle."""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lng_delta = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def covering_geohashes(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVERING_CELLS):
+    """Return the geohash prefixes of the cells covering a bounding box."""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lng_size = geohash_cell_size(precision)
+        rows = int((max_lat - min_lat) / lat_size) + 2
+        cols = int((max_lng - min_lng) / lng_size) + 2
+        if rows * cols <= max_cells:
+            break
+
+    cells = set()
+    for row in range(rows):
+        latitude = min(min_lat + row * lat_size, max_lat)
+        for col in range(cols):
+            longitude = min(min_lng + col * lng_size, max_lng)
+            cells.add(encode_geohash(latitude, longitude, precision))
+    return cells
+
+
+def distance_expression(latitude, longitude, lat_field, lng_field):
+    """Return a SQL expression of the haversine distance in kilometres."""
+    lat1 = Radians(Value(latitude, output_field=FloatField()))
+    lng1 = Radians(Value(longitude, output_field=FloatField()))
+    lat2 = Radians(F(lat_field))
+    lng2 = Radians(F(lng_field))
+
+    haversine = (
+        Power(Sin((lat2 - lat1) / 2), 2)
+        + Cos(lat1) * Cos(lat2) * Power(Sin((lng2 - lng1) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(haversine))
@@ -0,0 +1,103 @@
+"""
+Responsive image variants for property photos.
+
+Each photo gets thumbnail, medium and large renditions in WebP and JPEG,
+recorded in `Photo.variants`. Generation runs in a Celery worker and is
+idempotent: existing complete variants are kept unless forced.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest side, in pixels
+VARIANT_SIZES = {
+    'thumbnail': 320,
+    'medium': 800,
+    'large': 1600,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+class StorageError(Exception):
+    """Reading the original or storing a variant failed; worth retrying."""
+
+
+def variant_name(photo, variant, extension):
+    """Return the deterministic storage path of a variant."""
+    directory = os.path.dirname(photo.image.name).replace('properties/', 'properties/variants/', 1)
+    stem = os.path.splitext(os.path.basename(photo.image.name))[0]
+    return f'{directory}/{stem}_{variant}.{extension}'
+
+
+def has_variants(photo):
+    """Return True if every variant of the photo is recorded."""
+    return all(
+        all(extension in photo.variants.get(variant, {}) for extension in FORMATS)
+        for variant in VARIANT_SIZES
+    )
+
+
+def _store(name, content):
+    try:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        return default_storage.save(name, ContentFile(content))
+    except OSError as error:
+        raise StorageError(f'Variant {name} could not be stored.') from error
+
+
+def generate_variants(photo, force=False):
+    """
+    Render and store the variants of a photo.
+
+    Returns False when the original cannot be decoded: not an image,
+    truncated or corrupt. Storage errors (missing file, unreachable
+    backend) raise StorageError for the caller to retry.
+    """
+    if has_variants(photo) and not force:
+        return True
+
+    # Read fully first, so that decoding errors are not mistaken for
+    # storage errors
+    try:
+        with photo.image.open('rb') as original:
+            data = original.read()
+    except OSError as error:
+        raise StorageError(f'Photo {photo.pk} could not be read.') from error
+
+    try:
+        image = Image.open(BytesIO(data))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        # UnidentifiedImageError and truncated data are OSErrors
+        logger.warning('Photo %s could not be decoded.', photo.pk)
+        return False
+
+    variants = {}
+    for variant, size in VARIANT_SIZES.items():
+        rendition = image.copy()
+        rendition.thumbnail((size, size), Image.LANCZOS)
+        variants[variant] = {'width': rendition.width, 'height': rendition.height}
+
+        for extension, (image_format, options) in FORMATS.items():
+            buffer = BytesIO()
+            rendition.save(buffer, image_format, **options)
+            variants[variant][extension] = _store(variant_name(photo, variant, extension), buffer.getvalue())
+
+    photo.variants = variants
+    photo.thumbnail.name = variants['thumbnail']['jpeg']
+    photo.save(update_fields=['variants', 'thumbnail'])
+    return True
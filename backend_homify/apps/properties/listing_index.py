@@ -0,0 +1,152 @@
+"""
+Denormalized listing table.
+
+`PropertySearchIndex` holds one narrow row per published property with
+its filterable and sortable columns, location, primary photo and amenity
+ids. Anonymous listings whose parameters are all covered by the table are
+filtered, sorted and paginated on it alone; only the page's Property rows
+are then loaded for serialization. Rows are kept in sync by the signals in
+`signals.py` and can be rebuilt with `manage.py rebuild_listing_index`.
+"""
+from django.apps import apps as global_apps
+from django.db import transaction
+
+from .amenity_mask import split_ids
+
+BATCH_SIZE = 500
+
+# Query parameters the table can answer
+COVERED_FILTERS = {
+    'type', 'furnished', 'number_of_rooms', 'number_of_bedrooms',
+    'min_price', 'max_price', 'min_surface', 'city', 'district', 'amenities',
+}
+PAGINATION_PARAMS = {'page', 'page_size', 'cursor', 'count'}
+ORDERING_FIELDS = {'created_at', 'monthly_rent', 'surface'}
+DEFAULT_ORDERING = ['-created_at']
+
+ROW_FIELDS = [
+    'type', 'furnished', 'surface', 'number_of_rooms', 'number_of_bedrooms',
+    'monthly_rent', 'city', 'district', 'latitude', 'longitude', 'geohash',
+    'primary_photo', 'amenity_ids', 'amenity_mask', 'created_at', 'published_at',
+]
+
+
+def build_rows(property_ids, apps=global_apps):
+    """Return unsaved index rows for the published properties among the ids."""
+    Property = apps.get_model('properties', 'Property')
+    Photo = apps.get_model('properties', 'Photo')
+    PropertySearchIndex = apps.get_model('properties', 'PropertySearchIndex')
+
+    properties = list(
+        Property.objects.filter(pk__in=property_ids, status='PUBLISHED').select_related('address')
+    )
+    ids = [obj.pk for obj in properties]
+
+    # Same choice as the list serializer: primary photo, else the first one
+    photos = {}
+    for property_id, image in Photo.objects.filter(property_id__in=ids).order_by(
+        'property_id', '-is_primary', 'order', 'uploaded_at'
+    ).values_list('property_id', 'image'):
+        photos.setdefault(property_id, image)
+
+    amenities = {}
+    links = Property.amenities.through.objects.filter(property_id__in=ids)
+    for property_id, amenity_id in links.values_list('property_id', 'amenity_id'):
+        amenities.setdefault(property_id, []).append(amenity_id)
+
+    rows = []
+    for obj in properties:
+        address = getattr(obj, 'address', None)
+        rows.append(PropertySearchIndex(
+            id=obj.pk,
+            type=obj.type,
+            furnished=obj.furnished,
+            surface=obj.surface,
+            number_of_rooms=obj.number_of_rooms,
+            number_of_bedrooms=obj.number_of_bedrooms,
+            monthly_rent=obj.monthly_rent,
+            city=address.city if address else '',
+            district=address.district if address else '',
+            latitude=address.latitude if address else None,
+            longitude=address.longitude if address else None,
+            geohash=address.geohash if address else '',
+            primary_photo=photos.get(obj.pk, ''),
+            amenity_ids=sorted(amenities.get(obj.pk, [])),
+            amenity_mask=split_ids(amenities.get(obj.pk, []))[0],
+            created_at=obj.created_at,
+            published_at=obj.published_at,
+        ))
+    return rows
+
+
+def sync_properties(property_ids, apps=global_apps):
+    """Upsert the rows of published properties and drop the others."""
+    PropertySearchIndex = apps.get_model('properties', 'PropertySearchIndex')
+    property_ids = list(property_ids)
+    rows = build_rows(property_ids, apps)
+    published = {row.id for row in rows}
+
+    with transaction.atomic():
+        PropertySearchIndex.objects.filter(
+            id__in=[pk for pk in property_ids if pk not in published]
+        ).delete()
+        PropertySearchIndex.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=ROW_FIELDS,
+        )
+    return len(rows)
+
+
+def remove_properties(property_ids):
+    """Drop the rows of deleted properties."""
+    from .models import PropertySearchIndex
+    PropertySearchIndex.objects.filter(id__in=list(property_ids)).delete()
+
+
+def rebuild(apps=global_apps):
+    """Recreate the whole table from the published properties."""
+    Property = apps.get_model('properties', 'Property')
+    PropertySearchIndex = apps.get_model('properties', 'PropertySearchIndex')
+    ids = list(Property.objects.filter(status='PUBLISHED').values_list('pk', flat=True))
+
+    with transaction.atomic():
+        PropertySearchIndex.objects.all().delete()
+        for start in range(0, len(ids), BATCH_SIZE):
+            PropertySearchIndex.objects.bulk_create(build_rows(ids[start:start + BATCH_SIZE], apps))
+    return len(ids)
+
+
+def is_covered(query_params):
+    """Return True if every parameter can be answered by the table."""
+    for name in query_params:
+        if name in COVERED_FILTERS or name in PAGINATION_PARAMS:
+            continue
+        if name == 'ordering' and all(
+            term.strip().lstrip('-') in ORDERING_FIELDS
+            for term in query_params[name].split(',') if term.strip()
+        ):
+            continue
+        return False
+    return True
+
+
+def filter_listings(query_params):
+    """Return the filtered and ordered index rows, or None if the filters are invalid."""
+    from .filters import PropertySearchIndexFilter
+    from .models import PropertySearchIndex
+
+    filterset = PropertySearchIndexFilter(query_params, queryset=PropertySearchIndex.objects.all())
+    if not filterset.is_valid():
+        return None
+
+    ordering = [term.strip() for term in query_params.get('ordering', '').split(',') if term.strip()]
+    return filterset.qs.order_by(*(ordering or DEFAULT_ORDERING))
+
+
+def load_properties(rows, queryset):
+    """Load the Property objects of a page of index rows, in page order."""
+    ids = [row.id for row in rows]
+    properties = {obj.pk: obj for obj in queryset.filter(pk__in=ids)}
+    return [properties[pk] for pk in ids if pk in properties]
@@ -0,0 +1,62 @@
+"""
+Check the endpoint performance budgets over seeded data.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework_simplejwt.tokens import AccessToken
+
+from rental_project.testing import check_budgets, seed_data
+
+# (user, method, url) of the endpoints prone to N+1 queries
+CHECKED_REQUESTS = [
+    ('tenant', 'get', '/api/properties/'),
+    ('tenant', 'get', '/api/favorites/'),
+    ('landlord', 'get', '/api/properties/my_properties/'),
+    ('admin', 'get', '/api/auth/admin/users/'),
+]
+
+
+class Rollback(Exception):
+    """Raised to drop the seeded rows."""
+
+
+class Command(BaseCommand):
+    help = 'Seed listings in a rolled back transaction and check the endpoint budgets against them.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--landlords', type=int, default=10)
+        parser.add_argument('--properties', type=int, default=10, help='Annonces par propriétaire.')
+        parser.add_argument('--tenants', type=int, default=20)
+    
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                users = seed_data(
+                    landlords=options['landlords'],
+                    properties_per_landlord=options['properties'],
+                    tenants=options['tenants'],
+                )
+                client = Client()
+                requests = [
+                    (method, url, {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(users[role])}'})
+                    for role, method, url in CHECKED_REQUESTS
+                ]
+                try:
+                    results = check_budgets(client, requests)
+                except AssertionError as error:
+                    raise CommandError(f'Budget dépassé : {error}')
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            teardown_test_environment()
+        
+        for endpoint, metrics in results.items():
+            self.stdout.write(
+                f"{endpoint}: {metrics['queries']} requêtes, {metrics['db_ms']} ms SQL, "
+                f"{metrics['total_ms']} ms au total"
+            )
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} endpoints dans leur budget.'))
@@ -0,0 +1,34 @@
+"""
+Backfill responsive variants for existing photos.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties.images import StorageError, generate_variants, has_variants
+from apps.properties.models import Photo
+from apps.properties.tasks import generate_photo_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail, medium and large variants for existing photos.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate existing variants.')
+        parser.add_argument('--sync', action='store_true', help='Render in this process instead of Celery.')
+    
+    def handle(self, *args, **options):
+        queued = failed = 0
+        for photo in Photo.objects.order_by('pk').iterator(chunk_size=500):
+            if has_variants(photo) and not options['force']:
+                continue
+            
+            if options['sync']:
+                try:
+                    if not generate_variants(photo, force=options['force']):
+                        failed += 1
+                except StorageError:
+                    failed += 1
+            else:
+                generate_photo_variants.delay(photo.pk, force=options['force'])
+            queued += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'{queued} photos traitées, {failed} en échec.'))
@@ -0,0 +1,14 @@
+"""
+Rebuild the denormalized property listing table.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties import listing_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized listing table from the published properties.'
+    
+    def handle(self, *args, **options):
+        count = listing_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Table des annonces reconstruite ({count} annonces).'))
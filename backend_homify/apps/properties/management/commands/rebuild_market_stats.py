@@ -0,0 +1,14 @@
+"""
+Rebuild the rental market statistics.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties import market
+
+
+class Command(BaseCommand):
+    help = 'Recompute the market statistics exactly from the published properties.'
+    
+    def handle(self, *args, **options):
+        count = market.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Statistiques du marché recalculées ({count} annonces).'))
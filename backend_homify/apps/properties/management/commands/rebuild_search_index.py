@@ -0,0 +1,14 @@
+"""
+Rebuild the property full-text search index.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all properties.'
+    
+    def handle(self, *args, **options):
+        search.index_properties()
+        self.stdout.write(self.style.SUCCESS('Index de recherche reconstruit.'))
@@ -0,0 +1,14 @@
+"""
+Rebuild the precomputed similar-properties recommendations.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties import recommender
+
+
+class Command(BaseCommand):
+    help = 'Recompute the nearest neighbours of every published property.'
+    
+    def handle(self, *args, **options):
+        count = recommender.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Recommandations recalculées pour {count} annonces.'))
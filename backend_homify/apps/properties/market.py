@@ -0,0 +1,289 @@
+"""
+Rental market statistics.
+
+`MarketStats` rows roll up the published properties per city, district
+and type: listing count, rent and surface totals, and quantile sketches
+of the rent and of the price per m². Each property's current share is
+recorded in `MarketContribution`, so a change is applied as "withdraw the
+old contribution, add the new one" without rescanning anything. A nightly
+task rebuilds everything from the properties to correct any drift.
+"""
+import math
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import MarketContribution, MarketStats, Property
+
+RELATIVE_ACCURACY = 0.01
+QUANTILES = {'p10': 0.1, 'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+HISTOGRAM_BINS = 10
+
+
+class LogHistogramSketch:
+    """
+    Quantile sketch with logarithmic buckets (DDSketch-style).
+
+    Bucket boundaries grow geometrically, so any quantile is returned with
+    a relative error below `relative_accuracy`. Sketches can be merged and,
+    unlike most streaming sketches, values can be removed again.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, buckets=None, zero_count=0):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = dict(buckets or {})
+        self.zero_count = zero_count
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        return cls(
+            relative_accuracy=data['accuracy'],
+            buckets={int(key): count for key, count in data['buckets'].items()},
+            zero_count=data.get('zero', 0),
+        )
+
+    def to_dict(self):
+        return {
+            'accuracy': self.relative_accuracy,
+            'zero': self.zero_count,
+            'buckets': {str(key): count for key, count in sorted(self.buckets.items())},
+        }
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.buckets.values())
+
+    def key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def value(self, key):
+        """Representative value of a bucket, within the relative accuracy of its content."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        if value <= 0:
+            self.zero_count += count
+            return
+        key = self.key(value)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def remove(self, value, count=1):
+        if value <= 0:
+            self.zero_count = max(self.zero_count - count, 0)
+            return
+        key = self.key(value)
+        remaining = self.buckets.get(key, 0) - count
+        if remaining > 0:
+            self.buckets[key] = remaining
+        else:
+            self.buckets.pop(key, None)
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        return self
+
+    def quantile(self, q):
+        """Return the q-quantile, or None for an empty sketch."""
+        total = self.count
+        if not total:
+            return None
+
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return self.value(key)
+        return self.value(max(self.buckets))
+
+    def histogram(self, bins=HISTOGRAM_BINS):
+        """Return equal-width bins between the 1st and 99th percentiles."""
+        if not self.count:
+            return []
+
+        low, high = self.quantile(0.01), self.quantile(0.99)
+        width = (high - low) / bins if high > low else 1.0
+        counts = [0] * bins
+        for key, count in self.buckets.items():
+            index = int((self.value(key) - low) / width)
+            counts[min(max(index, 0), bins - 1)] += count
+        counts[0] += self.zero_count
+
+        return [
+            {'min': round(low + i * width, 2), 'max': round(low + (i + 1) * width, 2), 'count': count}
+            for i, count in enumerate(counts)
+        ]
+
+
+def _contribution_of(property_obj):
+    """Return the unsaved contribution of a property, None if it does not count."""
+    if property_obj is None or property_obj.status != 'PUBLISHED':
+        return None
+    address = getattr(property_obj, 'address', None)
+    if address is None or not address.city:
+        return None
+    return MarketContribution(
+        id=property_obj.pk,
+        city=address.city,
+        district=address.district or '',
+        type=property_obj.type,
+        monthly_rent=property_obj.monthly_rent,
+        surface=property_obj.surface,
+    )
+
+
+def _key(contribution):
+    return (contribution.city, contribution.district, contribution.type)
+
+
+def _apply(stats, contribution, sign):
+    """Add (sign=1) or withdraw (sign=-1) a contribution from a rollup row."""
+    rent = float(contribution.monthly_rent)
+    rent_sketch = LogHistogramSketch.from_dict(stats.rent_sketch)
+    price_sketch = LogHistogramSketch.from_dict(stats.price_per_m2_sketch)
+
+    if sign > 0:
+        rent_sketch.add(rent)
+        if contribution.surface > 0:
+            price_sketch.add(rent / contribution.surface)
+    else:
+        rent_sketch.remove(rent)
+        if contribution.surface > 0:
+            price_sketch.remove(rent / contribution.surface)
+
+    stats.listing_count = max(stats.listing_count + sign, 0)
+    stats.rent_total += sign * Decimal(contribution.monthly_rent)
+    stats.surface_total += sign * contribution.surface
+    stats.rent_sketch = rent_sketch.to_dict()
+    stats.price_per_m2_sketch = price_sketch.to_dict()
+
+
+def _same(old, new):
+    if old is None or new is None:
+        return old is new
+    return _key(old) == _key(new) and old.monthly_rent == new.monthly_rent and old.surface == new.surface
+
+
+def _locked_stats(contribution):
+    """Return the rollup row of a contribution's key, created if missing, locked."""
+    # get_or_create would lock nothing when the row is missing, and two
+    # first contributions to a key would both insert it
+    MarketStats.objects.bulk_create(
+        [MarketStats(city=contribution.city, district=contribution.district, type=contribution.type)],
+        ignore_conflicts=True,
+    )
+    return MarketStats.objects.select_for_update().get(
+        city=contribution.city, district=contribution.district, type=contribution.type
+    )
+
+
+def update_property(property_id):
+    """Move a property's contribution to match its current state."""
+    with transaction.atomic():
+        # Serializes updates of the same property, whose contribution row
+        # may not exist yet
+        property_obj = Property.objects.select_for_update(of=('self',)).filter(
+            pk=property_id
+        ).select_related('address').first()
+        new = _contribution_of(property_obj)
+
+        old = MarketContribution.objects.select_for_update().filter(pk=property_id).first()
+        if _same(old, new):
+            return False
+
+        if old is not None:
+            stats = MarketStats.objects.select_for_update().filter(
+                city=old.city, district=old.district, type=old.type
+            ).first()
+            if stats is not None:
+                _apply(stats, old, -1)
+                if stats.listing_count:
+                    stats.save()
+                else:
+                    stats.delete()
+            old.delete()
+
+        if new is not None:
+            stats = _locked_stats(new)
+            _apply(stats, new, 1)
+            stats.save()
+            new.save(force_insert=True)
+    return True
+
+
+def rebuild_all():
+    """Recompute every rollup exactly from the published properties."""
+    contributions = []
+    rollups = {}
+    queryset = Property.objects.filter(status='PUBLISHED').select_related('address')
+    for property_obj in queryset.iterator(chunk_size=1000):
+        contribution = _contribution_of(property_obj)
+        if contribution is None:
+            continue
+        contributions.append(contribution)
+        key = _key(contribution)
+        if key not in rollups:
+            rollups[key] = MarketStats(city=key[0], district=key[1], type=key[2], rent_total=Decimal(0))
+        _apply(rollups[key], contribution, 1)
+
+    with transaction.atomic():
+        MarketStats.objects.all().delete()
+        MarketContribution.objects.all().delete()
+        MarketStats.objects.bulk_create(rollups.values(), batch_size=500)
+        MarketContribution.objects.bulk_create(contributions, batch_size=1000)
+    return len(contributions)
+
+
+def _summary(sketch, mean):
+    result = {'mean': round(mean, 2) if mean is not None else None}
+    for name, q in QUANTILES.items():
+        value = sketch.quantile(q)
+        result[name] = round(value, 2) if value is not None else None
+    result['histogram'] = sketch.histogram()
+    return result
+
+
+def get_stats(city=None, district=None, property_type=None):
+    """Merge the matching rollups into one summary."""
+    rows = MarketStats.objects.all()
+    if city:
+        rows = rows.filter(city__iexact=city)
+    if district:
+        rows = rows.filter(district__iexact=district)
+    if property_type:
+        rows = rows.filter(type=property_type)
+
+    rent_sketch = LogHistogramSketch()
+    price_sketch = LogHistogramSketch()
+    count, rent_total, surface_total = 0, Decimal(0), 0.0
+    breakdown = []
+    for stats in rows:
+        row_rents = LogHistogramSketch.from_dict(stats.rent_sketch)
+        rent_sketch.merge(row_rents)
+        price_sketch.merge(LogHistogramSketch.from_dict(stats.price_per_m2_sketch))
+        count += stats.listing_count
+        rent_total += stats.rent_total
+        surface_total += stats.surface_total
+        median = row_rents.quantile(0.5)
+        breakdown.append({
+            'city': stats.city,
+            'district': stats.district,
+            'type': stats.type,
+            'listing_count': stats.listing_count,
+            'median_rent': round(median, 2) if median is not None else None,
+        })
+
+    return {
+        'listing_count': count,
+        'rent': _summary(rent_sketch, float(rent_total) / count if count else None),
+        'price_per_m2': _summary(price_sketch, float(rent_total) / surface_total if surface_total else None),
+        'breakdown': breakdown,
+    }
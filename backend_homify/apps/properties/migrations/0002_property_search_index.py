@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from apps.properties import search
+    search.create_index(schema_editor)
+    search.index_properties(using=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from apps.properties import search
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
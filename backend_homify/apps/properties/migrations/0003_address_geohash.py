@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+def fill_geohash(apps, schema_editor):
+    from apps.properties.geo import encode_geohash
+    Address = apps.get_model('properties', 'Address')
+    addresses = Address.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for address in addresses.iterator():
+        address.geohash = encode_geohash(address.latitude, address.longitude)
+        address.save(update_fields=['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_property_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
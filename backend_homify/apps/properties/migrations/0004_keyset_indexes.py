@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_address_geohash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['status', 'monthly_rent', 'id'], name='properties__status_1e6cac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['status', 'surface', 'id'], name='properties__status_d13d04_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProperty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distance', models.FloatField(verbose_name='Distance')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Rang')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='properties.property', verbose_name='Propriété')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property', verbose_name='Propriété similaire')),
+            ],
+            options={
+                'verbose_name': 'Propriété similaire',
+                'verbose_name_plural': 'Propriétés similaires',
+                'ordering': ['property', 'rank'],
+                'unique_together': {('property', 'rank')},
+            },
+        ),
+    ]
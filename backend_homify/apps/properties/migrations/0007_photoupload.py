@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('properties', '0006_photo_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='Type de contenu')),
+                ('total_size', models.PositiveIntegerField(verbose_name='Taille totale')),
+                ('received_size', models.PositiveIntegerField(default=0, verbose_name='Taille reçue')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photo_uploads', to='properties.property', verbose_name='Propriété')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photo_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Upload de photo',
+                'verbose_name_plural': 'Uploads de photos',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
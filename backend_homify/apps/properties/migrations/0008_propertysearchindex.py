@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('amenities', '0001_initial'),
+        ('properties', '0007_photoupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertySearchIndex',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Propriété')),
+                ('type', models.CharField(max_length=20, verbose_name='Type')),
+                ('furnished', models.BooleanField(verbose_name='Meublé')),
+                ('surface', models.FloatField(verbose_name='Surface (m²)')),
+                ('number_of_rooms', models.IntegerField(verbose_name='Nombre de pièces')),
+                ('number_of_bedrooms', models.IntegerField(verbose_name='Nombre de chambres')),
+                ('monthly_rent', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Loyer mensuel')),
+                ('city', models.CharField(blank=True, max_length=100, verbose_name='Ville')),
+                ('district', models.CharField(blank=True, max_length=100, verbose_name='Quartier')),
+                ('latitude', models.FloatField(blank=True, null=True, verbose_name='Latitude')),
+                ('longitude', models.FloatField(blank=True, null=True, verbose_name='Longitude')),
+                ('geohash', models.CharField(blank=True, max_length=12, verbose_name='Geohash')),
+                ('primary_photo', models.CharField(blank=True, max_length=255, verbose_name='Photo principale')),
+                ('amenity_ids', models.JSONField(blank=True, default=list, verbose_name='Équipements')),
+                ('created_at', models.DateTimeField(verbose_name='Date de création')),
+                ('published_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de publication')),
+            ],
+            options={
+                'verbose_name': 'Index de recherche',
+                'verbose_name_plural': 'Index de recherche',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at', '-id'], name='properties__created_050647_idx'), models.Index(fields=['monthly_rent', 'id'], name='properties__monthly_cdd360_idx'), models.Index(fields=['surface', 'id'], name='properties__surface_94053f_idx'), models.Index(fields=['type', 'monthly_rent'], name='properties__type_f5a18f_idx'), models.Index(fields=['city', 'type', 'monthly_rent'], name='properties__city_588909_idx'), models.Index(fields=['city', 'district'], name='properties__city_219bb7_idx'), models.Index(fields=['geohash'], name='properties__geohash_01f720_idx')],
+            },
+        ),
+        # Filled by 0009 once the amenity mask column exists
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:13
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+MAX_MASK_ID = 63
+
+
+def fill_amenity_masks(apps, schema_editor):
+    """Compute the amenity masks and fill the listing index.
+
+    Frozen copy of amenity_mask.compute_masks and listing_index.build_rows
+    as of this migration: later changes to those modules must not alter it.
+    """
+    Property = apps.get_model('properties', 'Property')
+    Photo = apps.get_model('properties', 'Photo')
+    PropertySearchIndex = apps.get_model('properties', 'PropertySearchIndex')
+    links = Property.amenities.through.objects
+
+    ids = list(Property.objects.values_list('pk', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+
+        amenities = {}
+        for property_id, amenity_id in links.filter(property_id__in=batch).values_list(
+            'property_id', 'amenity_id'
+        ):
+            amenities.setdefault(property_id, []).append(amenity_id)
+
+        masks = {}
+        for property_id in batch:
+            mask = 0
+            for amenity_id in amenities.get(property_id, []):
+                if 1 <= amenity_id <= MAX_MASK_ID:
+                    mask |= 1 << (amenity_id - 1)
+            masks[property_id] = mask
+        Property.objects.bulk_update(
+            [Property(pk=pk, amenity_mask=mask) for pk, mask in masks.items()], ['amenity_mask']
+        )
+
+        published = list(
+            Property.objects.filter(pk__in=batch, status='PUBLISHED').select_related('address')
+        )
+        photos = {}
+        for property_id, image in Photo.objects.filter(
+            property_id__in=[obj.pk for obj in published]
+        ).order_by('property_id', '-is_primary', 'order', 'uploaded_at').values_list('property_id', 'image'):
+            photos.setdefault(property_id, image)
+
+        rows = []
+        for obj in published:
+            address = getattr(obj, 'address', None)
+            rows.append(PropertySearchIndex(
+                id=obj.pk,
+                type=obj.type,
+                furnished=obj.furnished,
+                surface=obj.surface,
+                number_of_rooms=obj.number_of_rooms,
+                number_of_bedrooms=obj.number_of_bedrooms,
+                monthly_rent=obj.monthly_rent,
+                city=address.city if address else '',
+                district=address.district if address else '',
+                latitude=address.latitude if address else None,
+                longitude=address.longitude if address else None,
+                geohash=address.geohash if address else '',
+                primary_photo=photos.get(obj.pk, ''),
+                amenity_ids=sorted(amenities.get(obj.pk, [])),
+                amenity_mask=masks[obj.pk],
+                created_at=obj.created_at,
+                published_at=obj.published_at,
+            ))
+        PropertySearchIndex.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('amenities', '0001_initial'),
+        ('properties', '0008_propertysearchindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Masque des équipements'),
+        ),
+        migrations.AddField(
+            model_name='propertysearchindex',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, verbose_name='Masque des équipements'),
+        ),
+        migrations.RunPython(fill_amenity_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:15
+
+import math
+from decimal import Decimal
+
+from django.db import migrations, models
+
+RELATIVE_ACCURACY = 0.01
+
+
+def fill_market_stats(apps, schema_editor):
+    """Roll up the published properties.
+
+    Frozen copy of market.rebuild_all and its quantile sketch as of this
+    migration: later changes to that module must not alter it.
+    """
+    Property = apps.get_model('properties', 'Property')
+    MarketContribution = apps.get_model('properties', 'MarketContribution')
+    MarketStats = apps.get_model('properties', 'MarketStats')
+    gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+
+    def add(sketch, value):
+        if value <= 0:
+            sketch['zero'] += 1
+            return
+        key = str(math.ceil(math.log(value) / math.log(gamma)))
+        sketch['buckets'][key] = sketch['buckets'].get(key, 0) + 1
+
+    contributions = []
+    rollups = {}
+    sketches = {}
+    for obj in Property.objects.filter(status='PUBLISHED').select_related('address').iterator(chunk_size=1000):
+        address = getattr(obj, 'address', None)
+        if address is None or not address.city:
+            continue
+        key = (address.city, address.district or '', obj.type)
+        contributions.append(MarketContribution(
+            id=obj.pk, city=key[0], district=key[1], type=key[2],
+            monthly_rent=obj.monthly_rent, surface=obj.surface,
+        ))
+        if key not in rollups:
+            rollups[key] = MarketStats(city=key[0], district=key[1], type=key[2], rent_total=Decimal(0))
+            sketches[key] = tuple(
+                {'accuracy': RELATIVE_ACCURACY, 'zero': 0, 'buckets': {}} for _ in range(2)
+            )
+        stats = rollups[key]
+        rent_sketch, price_sketch = sketches[key]
+        rent = float(obj.monthly_rent)
+        add(rent_sketch, rent)
+        if obj.surface > 0:
+            add(price_sketch, rent / obj.surface)
+        stats.listing_count += 1
+        stats.rent_total += Decimal(obj.monthly_rent)
+        stats.surface_total += obj.surface
+
+    for key, stats in rollups.items():
+        stats.rent_sketch, stats.price_per_m2_sketch = (
+            {**sketch, 'buckets': dict(sorted(sketch['buckets'].items(), key=lambda item: int(item[0])))}
+            for sketch in sketches[key]
+        )
+    MarketStats.objects.bulk_create(rollups.values(), batch_size=500)
+    MarketContribution.objects.bulk_create(contributions, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_property_amenity_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketContribution',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Propriété')),
+                ('city', models.CharField(max_length=100, verbose_name='Ville')),
+                ('district', models.CharField(blank=True, max_length=100, verbose_name='Quartier')),
+                ('type', models.CharField(max_length=20, verbose_name='Type')),
+                ('monthly_rent', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Loyer mensuel')),
+                ('surface', models.FloatField(verbose_name='Surface (m²)')),
+            ],
+            options={
+                'verbose_name': 'Contribution au marché',
+                'verbose_name_plural': 'Contributions au marché',
+            },
+        ),
+        migrations.CreateModel(
+            name='MarketStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100, verbose_name='Ville')),
+                ('district', models.CharField(blank=True, max_length=100, verbose_name='Quartier')),
+                ('type', models.CharField(max_length=20, verbose_name='Type')),
+                ('listing_count', models.PositiveIntegerField(default=0, verbose_name="Nombre d'annonces")),
+                ('rent_total', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Total des loyers')),
+                ('surface_total', models.FloatField(default=0, verbose_name='Surface totale')),
+                ('rent_sketch', models.JSONField(default=dict, verbose_name='Distribution des loyers')),
+                ('price_per_m2_sketch', models.JSONField(default=dict, verbose_name='Distribution du prix au m²')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+            ],
+            options={
+                'verbose_name': 'Statistiques du marché',
+                'verbose_name_plural': 'Statistiques du marché',
+                'ordering': ['city', 'district', 'type'],
+                'unique_together': {('city', 'district', 'type')},
+            },
+        ),
+        migrations.RunPython(fill_market_stats, migrations.RunPython.noop),
+    ]
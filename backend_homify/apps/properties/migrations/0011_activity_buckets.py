@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('properties', '0010_market_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Vues')),
+                ('favorites', models.PositiveIntegerField(default=0, verbose_name='Favoris')),
+                ('messages', models.PositiveIntegerField(default=0, verbose_name='Messages')),
+                ('bucket', models.DateTimeField(verbose_name='Heure')),
+                ('landlord', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Propriétaire')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property', verbose_name='Propriété')),
+            ],
+            options={
+                'verbose_name': 'Activité horaire',
+                'verbose_name_plural': 'Activités horaires',
+                'ordering': ['bucket'],
+                'indexes': [models.Index(fields=['landlord', 'bucket'], name='properties__landlor_26301f_idx')],
+                'unique_together': {('property', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Vues')),
+                ('favorites', models.PositiveIntegerField(default=0, verbose_name='Favoris')),
+                ('messages', models.PositiveIntegerField(default=0, verbose_name='Messages')),
+                ('bucket', models.DateField(verbose_name='Jour')),
+                ('landlord', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Propriétaire')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property', verbose_name='Propriété')),
+            ],
+            options={
+                'verbose_name': 'Activité journalière',
+                'verbose_name_plural': 'Activités journalières',
+                'ordering': ['bucket'],
+                'indexes': [models.Index(fields=['landlord', 'bucket'], name='properties__landlor_087105_idx')],
+                'unique_together': {('property', 'bucket')},
+            },
+        ),
+    ]
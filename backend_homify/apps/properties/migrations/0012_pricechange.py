@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_activity_buckets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_rent', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Ancien loyer')),
+                ('new_rent', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Nouveau loyer')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, verbose_name='Date du changement')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de traitement')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_changes', to='properties.property', verbose_name='Propriété')),
+            ],
+            options={
+                'verbose_name': 'Changement de prix',
+                'verbose_name_plural': 'Changements de prix',
+                'ordering': ['-changed_at'],
+                'indexes': [models.Index(fields=['processed_at', 'changed_at'], name='properties__process_d11b49_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_pricechange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='rejection_reason',
+            field=models.TextField(blank=True, verbose_name='Motif du rejet'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_moderation_queue(apps, schema_editor):
+    from apps.properties import moderation_queue
+    moderation_queue.sync(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('properties', '0013_property_rejection_reason'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationTicket',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='moderation_ticket', serialize=False, to='properties.property', verbose_name='Propriété')),
+                ('priority', models.FloatField(default=0, verbose_name='Priorité')),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin de la réservation')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="Date d'entrée")),
+                ('claimed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='moderation_tickets', to=settings.AUTH_USER_MODEL, verbose_name='Modérateur')),
+            ],
+            options={
+                'verbose_name': 'Ticket de modération',
+                'verbose_name_plural': 'Tickets de modération',
+                'ordering': ['-priority', 'property'],
+                'indexes': [models.Index(fields=['-priority', 'property'], name='properties__priorit_7ef388_idx'), models.Index(fields=['claimed_by', 'lease_expires_at'], name='properties__claimed_9ddbd5_idx')],
+            },
+        ),
+        migrations.RunPython(fill_moderation_queue, migrations.RunPython.noop),
+    ]
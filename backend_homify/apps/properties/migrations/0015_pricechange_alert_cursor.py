@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_moderationticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricechange',
+            name='alert_cursor',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Dernier utilisateur alerté'),
+        ),
+    ]
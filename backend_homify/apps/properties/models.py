@@ -1,6 +1,8 @@
 """
 Property models for the rental platform.
 """
+import uuid
+
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator
@@ -76,9 +78,13 @@ class Property(models.Model):
         verbose_name='Frais d\'agence'
     )
     
+    # Bit n-1 set for amenity n, see amenity_mask.py
+    amenity_mask = models.BigIntegerField(default=0, editable=False, verbose_name='Masque des équipements')
+    
     # Status and metadata
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='DRAFT', verbose_name='Statut')
     view_count = models.IntegerField(default=0, verbose_name='Nombre de vues')
+    rejection_reason = models.TextField(blank=True, verbose_name='Motif du rejet')
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de création')
@@ -93,15 +99,41 @@ class Property(models.Model):
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['landlord', 'status']),
             models.Index(fields=['type', 'status']),
+            models.Index(fields=['status', 'monthly_rent', 'id']),
+            models.Index(fields=['status', 'surface', 'id']),
         ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded status and rent to detect their changes on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_rent = instance.__dict__.get('monthly_rent')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        rent_saved = update_fields is None or 'monthly_rent' in update_fields
+        super().save(*args, **kwargs)
+        self._loaded_status = self.status
+        if rent_saved:
+            # Picked up by the price-drop alerts, whatever the edit path
+            from .price_alerts import record_price_change
+            record_price_change(self, getattr(self, '_loaded_rent', None))
+            self._loaded_rent = self.monthly_rent
+    
+    @property
+    def was_published(self):
+        """Return True if the property was published when loaded or last saved."""
+        return getattr(self, '_loaded_status', None) == 'PUBLISHED'
+    
     def increment_view_count(self):
-        """Increment view count."""
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        """Record a view; buffered views are flushed to the database in batches."""
+        from .counters import record_view
+        record_view(self.pk)
 
 
 class Address(models.Model):
@@ -121,6 +153,7 @@ class Address(models.Model):
     
     latitude = models.FloatField(null=True, blank=True, verbose_name='Latitude')
     longitude = models.FloatField(null=True, blank=True, verbose_name='Longitude')
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False, verbose_name='Geohash')
     
     class Meta:
         verbose_name = 'Adresse'
@@ -129,6 +162,19 @@ class Address(models.Model):
     def __str__(self):
         return f"{self.street_address}, {self.city}"
     
+    def save(self, *args, **kwargs):
+        """Keep the geohash in sync with the coordinates."""
+        from .geo import encode_geohash
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+    
     def get_full_address(self):
         """Return full formatted address."""
         parts = [self.street_address, self.district, self.city, self.postal_code]
@@ -152,6 +198,7 @@ class Photo(models.Model):
         blank=True,
         verbose_name='Miniature'
     )
+    variants = models.JSONField(default=dict, blank=True, verbose_name='Variantes')
     is_primary = models.BooleanField(default=False, verbose_name='Photo principale')
     order = models.IntegerField(default=0, verbose_name='Ordre')
     
@@ -164,3 +211,283 @@ class Photo(models.Model):
     
     def __str__(self):
         return f"Photo {self.id} - {self.property.title}"
+
+
+class SimilarProperty(models.Model):
+    """Precomputed nearest neighbour of a published property."""
+    
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='similar_links',
+        verbose_name='Propriété'
+    )
+    similar = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Propriété similaire'
+    )
+    distance = models.FloatField(verbose_name='Distance')
+    rank = models.PositiveSmallIntegerField(verbose_name='Rang')
+    
+    class Meta:
+        verbose_name = 'Propriété similaire'
+        verbose_name_plural = 'Propriétés similaires'
+        ordering = ['property', 'rank']
+        unique_together = ('property', 'rank')
+    
+    def __str__(self):
+        return f"{self.property_id} → {self.similar_id} (#{self.rank})"
+
+
+class PropertySearchIndex(models.Model):
+    """Flattened, read-only row of a published property used for listings."""
+    
+    # Same value as the property id, so orderings and cursors match Property
+    id = models.BigIntegerField(primary_key=True, verbose_name='Propriété')
+    
+    type = models.CharField(max_length=20, verbose_name='Type')
+    furnished = models.BooleanField(verbose_name='Meublé')
+    surface = models.FloatField(verbose_name='Surface (m²)')
+    number_of_rooms = models.IntegerField(verbose_name='Nombre de pièces')
+    number_of_bedrooms = models.IntegerField(verbose_name='Nombre de chambres')
+    monthly_rent = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Loyer mensuel')
+    
+    city = models.CharField(max_length=100, blank=True, verbose_name='Ville')
+    district = models.CharField(max_length=100, blank=True, verbose_name='Quartier')
+    latitude = models.FloatField(null=True, blank=True, verbose_name='Latitude')
+    longitude = models.FloatField(null=True, blank=True, verbose_name='Longitude')
+    geohash = models.CharField(max_length=12, blank=True, verbose_name='Geohash')
+    
+    primary_photo = models.CharField(max_length=255, blank=True, verbose_name='Photo principale')
+    amenity_ids = models.JSONField(default=list, blank=True, verbose_name='Équipements')
+    amenity_mask = models.BigIntegerField(default=0, verbose_name='Masque des équipements')
+    
+    created_at = models.DateTimeField(verbose_name='Date de création')
+    published_at = models.DateTimeField(null=True, blank=True, verbose_name='Date de publication')
+    
+    class Meta:
+        verbose_name = 'Index de recherche'
+        verbose_name_plural = 'Index de recherche'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['monthly_rent', 'id']),
+            models.Index(fields=['surface', 'id']),
+            models.Index(fields=['type', 'monthly_rent']),
+            models.Index(fields=['city', 'type', 'monthly_rent']),
+            models.Index(fields=['city', 'district']),
+            models.Index(fields=['geohash']),
+        ]
+    
+    def __str__(self):
+        return f"Index {self.id}"
+
+
+class MarketStats(models.Model):
+    """Rental market rollup of published properties per city, district and type."""
+    
+    city = models.CharField(max_length=100, verbose_name='Ville')
+    district = models.CharField(max_length=100, blank=True, verbose_name='Quartier')
+    type = models.CharField(max_length=20, verbose_name='Type')
+    
+    listing_count = models.PositiveIntegerField(default=0, verbose_name='Nombre d\'annonces')
+    rent_total = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='Total des loyers')
+    surface_total = models.FloatField(default=0, verbose_name='Surface totale')
+    # Serialized LogHistogramSketch, see market.py
+    rent_sketch = models.JSONField(default=dict, verbose_name='Distribution des loyers')
+    price_per_m2_sketch = models.JSONField(default=dict, verbose_name='Distribution du prix au m²')
+    
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Date de modification')
+    
+    class Meta:
+        verbose_name = 'Statistiques du marché'
+        verbose_name_plural = 'Statistiques du marché'
+        ordering = ['city', 'district', 'type']
+        unique_together = ('city', 'district', 'type')
+    
+    def __str__(self):
+        return f"{self.city} / {self.district or '-'} / {self.type} ({self.listing_count})"
+
+
+class MarketContribution(models.Model):
+    """What a published property currently adds to the market rollups."""
+    
+    # Same value as the property id; kept after deletion until withdrawn
+    id = models.BigIntegerField(primary_key=True, verbose_name='Propriété')
+    city = models.CharField(max_length=100, verbose_name='Ville')
+    district = models.CharField(max_length=100, blank=True, verbose_name='Quartier')
+    type = models.CharField(max_length=20, verbose_name='Type')
+    monthly_rent = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Loyer mensuel')
+    surface = models.FloatField(verbose_name='Surface (m²)')
+    
+    class Meta:
+        verbose_name = 'Contribution au marché'
+        verbose_name_plural = 'Contributions au marché'
+    
+    def __str__(self):
+        return f"Contribution {self.id}"
+
+
+class ActivityCounts(models.Model):
+    """Views, favorites and messages of a listing over one time bucket."""
+    
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Propriété'
+    )
+    # Copied from the property so a landlord's dashboard is one range scan
+    landlord = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Propriétaire'
+    )
+    views = models.PositiveIntegerField(default=0, verbose_name='Vues')
+    favorites = models.PositiveIntegerField(default=0, verbose_name='Favoris')
+    messages = models.PositiveIntegerField(default=0, verbose_name='Messages')
+    
+    class Meta:
+        abstract = True
+
+
+class HourlyActivity(ActivityCounts):
+    """Hourly activity bucket of a listing."""
+    
+    bucket = models.DateTimeField(verbose_name='Heure')
+    
+    class Meta:
+        verbose_name = 'Activité horaire'
+        verbose_name_plural = 'Activités horaires'
+        ordering = ['bucket']
+        unique_together = ('property', 'bucket')
+        indexes = [
+            models.Index(fields=['landlord', 'bucket']),
+        ]
+    
+    def __str__(self):
+        return f"{self.property_id} @ {self.bucket:%Y-%m-%d %H:00}"
+
+
+class DailyActivity(ActivityCounts):
+    """Daily activity bucket of a listing."""
+    
+    bucket = models.DateField(verbose_name='Jour')
+    
+    class Meta:
+        verbose_name = 'Activité journalière'
+        verbose_name_plural = 'Activités journalières'
+        ordering = ['bucket']
+        unique_together = ('property', 'bucket')
+        indexes = [
+            models.Index(fields=['landlord', 'bucket']),
+        ]
+    
+    def __str__(self):
+        return f"{self.property_id} @ {self.bucket}"
+
+
+class PhotoUpload(models.Model):
+    """Resumable photo upload session."""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='photo_uploads',
+        verbose_name='Propriété'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='photo_uploads',
+        verbose_name='Utilisateur'
+    )
+    
+    filename = models.CharField(max_length=255, verbose_name='Nom du fichier')
+    content_type = models.CharField(max_length=100, blank=True, verbose_name='Type de contenu')
+    total_size = models.PositiveIntegerField(verbose_name='Taille totale')
+    received_size = models.PositiveIntegerField(default=0, verbose_name='Taille reçue')
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de création')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Date de modification')
+    
+    class Meta:
+        verbose_name = 'Upload de photo'
+        verbose_name_plural = 'Uploads de photos'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received_size}/{self.total_size})"
+
+
+class PriceChange(models.Model):
+    """Rent change of a property, consumed by the price-drop alerts."""
+    
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='price_changes',
+        verbose_name='Propriété'
+    )
+    old_rent = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Ancien loyer')
+    new_rent = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Nouveau loyer')
+    
+    changed_at = models.DateTimeField(auto_now_add=True, verbose_name='Date du changement')
+    # Set when the alert job has taken the change
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name='Date de traitement')
+    # Followers up to this user id were emailed by an interrupted run
+    alert_cursor = models.BigIntegerField(null=True, blank=True, verbose_name='Dernier utilisateur alerté')
+    
+    class Meta:
+        verbose_name = 'Changement de prix'
+        verbose_name_plural = 'Changements de prix'
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['processed_at', 'changed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.property_id}: {self.old_rent} → {self.new_rent}"
+
+
+class ModerationTicket(models.Model):
+    """Place of a pending property in the moderation queue."""
+    
+    # Same value as the property id
+    property = models.OneToOneField(
+        Property,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='moderation_ticket',
+        verbose_name='Propriété'
+    )
+    # Higher is reviewed first, refreshed periodically, see moderation_queue.py
+    priority = models.FloatField(default=0, verbose_name='Priorité')
+    
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='moderation_tickets',
+        verbose_name='Modérateur'
+    )
+    lease_expires_at = models.DateTimeField(null=True, blank=True, verbose_name='Fin de la réservation')
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date d\'entrée')
+    
+    class Meta:
+        verbose_name = 'Ticket de modération'
+        verbose_name_plural = 'Tickets de modération'
+        ordering = ['-priority', 'property']
+        indexes = [
+            models.Index(fields=['-priority', 'property']),
+            models.Index(fields=['claimed_by', 'lease_expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"Ticket {self.property_id} ({self.priority:.1f})"
@@ -0,0 +1,118 @@
+"""
+Moderation of pending properties.
+
+Approvals and rejections are applied to any number of listings with one
+conditional UPDATE. Querysets do not send `post_save`, so the work the
+property signals would have done on publication (listing table, response
+cache, recommendations, market statistics, saved search matching) is
+triggered here explicitly once the transaction commits. Landlords are
+emailed by a Celery task, one email per landlord. Moderated properties
+leave the moderation queue.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from rental_project.celery import enqueue
+
+from .models import ModerationTicket, Property
+
+logger = logging.getLogger(__name__)
+
+MAX_PROPERTY_IDS = 200
+BATCH_SIZE = 100
+
+
+def _claim_pending(property_ids):
+    return list(
+        Property.objects.select_for_update()
+        .filter(pk__in=property_ids, status='PENDING')
+        .values_list('pk', flat=True)
+    )
+
+
+def after_publication(property_ids):
+    """Refresh the data derived from newly published properties."""
+    from apps.searches.tasks import match_saved_searches
+    from . import cache, listing_index
+    from .tasks import update_market_stats, update_similar_properties
+
+    listing_index.sync_properties(property_ids)
+    cache.invalidate(property_ids, lists=True)
+    for property_id in property_ids:
+        enqueue(update_similar_properties, property_id)
+        enqueue(update_market_stats, property_id)
+        enqueue(match_saved_searches, property_id)
+
+
+def approve_properties(property_ids):
+    """Publish the pending properties among property_ids; return their ids."""
+    from .tasks import notify_moderation
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = _claim_pending(property_ids)
+        if not ids:
+            return []
+        Property.objects.filter(pk__in=ids).update(
+            status='PUBLISHED', published_at=now, rejection_reason='', updated_at=now
+        )
+        ModerationTicket.objects.filter(property_id__in=ids).delete()
+        transaction.on_commit(lambda: after_publication(ids))
+        transaction.on_commit(lambda: enqueue(notify_moderation, ids, 'PUBLISHED'))
+    return ids
+
+
+def reject_properties(property_ids, reason=''):
+    """Reject the pending properties among property_ids; return their ids."""
+    from .tasks import notify_moderation
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = _claim_pending(property_ids)
+        if not ids:
+            return []
+        # Pending listings were never public, nothing derived to refresh
+        Property.objects.filter(pk__in=ids).update(
+            status='REJECTED', rejection_reason=reason, updated_at=now
+        )
+        ModerationTicket.objects.filter(property_id__in=ids).delete()
+        transaction.on_commit(lambda: enqueue(notify_moderation, ids, 'REJECTED'))
+    return ids
+
+
+def build_email(landlord, properties, decision):
+    email, first_name = landlord
+    if decision == 'PUBLISHED':
+        subject = 'Vos annonces ont été publiées' if len(properties) > 1 else 'Votre annonce a été publiée'
+        lines = [f"Bonjour {first_name},", '', "Les annonces suivantes sont désormais en ligne :", '']
+        lines += [f"- {title}" for title, _ in properties]
+    else:
+        subject = 'Vos annonces ont été rejetées' if len(properties) > 1 else 'Votre annonce a été rejetée'
+        lines = [f"Bonjour {first_name},", '', "Les annonces suivantes n'ont pas été acceptées :", '']
+        lines += [f"- {title}" + (f" : {reason}" if reason else '') for title, reason in properties]
+    return EmailMessage(subject, '\n'.join(lines), settings.DEFAULT_FROM_EMAIL, [email])
+
+
+def notify_landlords(property_ids, decision):
+    """Email each landlord the moderation decision on their properties."""
+    rows = Property.objects.filter(pk__in=property_ids, status=decision).order_by(
+        'landlord_id', 'pk'
+    ).values_list('landlord_id', 'landlord__email', 'landlord__first_name', 'title', 'rejection_reason')
+
+    by_landlord = {}
+    for landlord_id, email, first_name, title, reason in rows:
+        by_landlord.setdefault((landlord_id, email, first_name), []).append((title, reason))
+
+    messages = [
+        build_email((email, first_name), properties, decision)
+        for (_, email, first_name), properties in by_landlord.items()
+    ]
+    sent = 0
+    with get_connection() as connection:
+        for start in range(0, len(messages), BATCH_SIZE):
+            sent += connection.send_messages(messages[start:start + BATCH_SIZE]) or 0
+    return sent
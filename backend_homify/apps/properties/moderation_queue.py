@@ -0,0 +1,152 @@
+"""
+Moderation queue with leases.
+
+Every pending property has a `ModerationTicket` holding its priority and,
+while a moderator reviews it, an expiring lease. Moderators claim the
+highest-priority tickets that are not leased: on PostgreSQL with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent claims never wait on
+each other; elsewhere with one conditional UPDATE of the candidates,
+keeping those that were still free, so a race returns fewer tickets
+rather than the same ones twice. An expired lease frees the ticket again.
+
+The priority grows with the open reports on the listing, the landlord's
+rejected listings and the waiting time, and shrinks with the landlord's
+published listings. It is refreshed by the `refresh_moderation_queue`
+Celery task.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+LEASE_SECONDS = getattr(settings, 'MODERATION_LEASE_SECONDS', 600)
+MAX_CLAIM = 20
+
+# Priority points
+REPORT_WEIGHT = 10.0     # per open report on the listing
+REJECTION_WEIGHT = 5.0   # per rejected listing of the landlord
+TRUST_WEIGHT = 1.0       # per published listing of the landlord, capped
+TRUST_CAP = 5
+AGE_WEIGHT = 1.0         # per hour in the queue
+
+
+def compute_priorities(properties, apps=global_apps):
+    """Return {property_id: priority} for (id, landlord_id, created_at) rows."""
+    Property = apps.get_model('properties', 'Property')
+    Report = apps.get_model('reports', 'Report')
+
+    property_ids = [pk for pk, _, _ in properties]
+    landlord_ids = {landlord_id for _, landlord_id, _ in properties}
+
+    reports = dict(
+        Report.objects.filter(property_id__in=property_ids, status__in=('PENDING', 'REVIEWED'))
+        .values('property').annotate(total=Count('pk')).values_list('property', 'total')
+    )
+    history = defaultdict(dict)
+    rows = Property.objects.filter(
+        landlord_id__in=landlord_ids, status__in=('REJECTED', 'PUBLISHED', 'RENTED')
+    ).values('landlord', 'status').annotate(total=Count('pk')).values_list('landlord', 'status', 'total')
+    for landlord_id, status, total in rows:
+        history[landlord_id][status] = total
+
+    now = timezone.now()
+    priorities = {}
+    for pk, landlord_id, created_at in properties:
+        landlord = history[landlord_id]
+        trusted = min(landlord.get('PUBLISHED', 0) + landlord.get('RENTED', 0), TRUST_CAP)
+        hours = (now - created_at).total_seconds() / 3600
+        priorities[pk] = (
+            REPORT_WEIGHT * reports.get(pk, 0)
+            + REJECTION_WEIGHT * landlord.get('REJECTED', 0)
+            - TRUST_WEIGHT * trusted
+            + AGE_WEIGHT * hours
+        )
+    return priorities
+
+
+def sync(property_ids=None, apps=global_apps):
+    """
+    Align the tickets with the pending properties and refresh their priority.
+
+    Limited to property_ids when given. Returns the number of queued properties.
+    """
+    Property = apps.get_model('properties', 'Property')
+    ModerationTicket = apps.get_model('properties', 'ModerationTicket')
+
+    pending = Property.objects.filter(status='PENDING')
+    tickets = ModerationTicket.objects.all()
+    if property_ids is not None:
+        pending = pending.filter(pk__in=property_ids)
+        tickets = tickets.filter(property_id__in=property_ids)
+
+    rows = list(pending.values_list('pk', 'landlord_id', 'created_at'))
+    priorities = compute_priorities(rows, apps)
+
+    with transaction.atomic():
+        tickets.exclude(property_id__in=priorities).delete()
+        existing = list(tickets.filter(property_id__in=priorities))
+        for ticket in existing:
+            ticket.priority = priorities[ticket.property_id]
+        ModerationTicket.objects.bulk_update(existing, ['priority'], batch_size=500)
+
+        known = {ticket.property_id for ticket in existing}
+        ModerationTicket.objects.bulk_create(
+            [ModerationTicket(property_id=pk, priority=priority)
+             for pk, priority in priorities.items() if pk not in known],
+            ignore_conflicts=True,
+        )
+    return len(priorities)
+
+
+def _available(user, now):
+    return Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now) | Q(claimed_by=user)
+
+
+def claim(user, count):
+    """
+    Lease up to count tickets to a moderator, highest priority first.
+
+    Leases the moderator already holds are renewed and count towards the
+    total. Returns the leased property ids and the lease expiry.
+    """
+    from .models import ModerationTicket
+
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=LEASE_SECONDS)
+    candidates = ModerationTicket.objects.filter(
+        _available(user, now), property__status='PENDING'
+    ).order_by('-priority', 'property_id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                candidates.select_for_update(skip_locked=True, of=('self',)).values_list('property_id', flat=True)[:count]
+            )
+            ModerationTicket.objects.filter(property_id__in=ids).update(
+                claimed_by=user, lease_expires_at=expires_at
+            )
+        return ids, expires_at
+
+    # Without row locks, only the tickets still free when updated are ours
+    ids = list(candidates.values_list('property_id', flat=True)[:count])
+    ModerationTicket.objects.filter(_available(user, now), property_id__in=ids).update(
+        claimed_by=user, lease_expires_at=expires_at
+    )
+    won = set(ModerationTicket.objects.filter(
+        property_id__in=ids, claimed_by=user, lease_expires_at=expires_at
+    ).values_list('property_id', flat=True))
+    return [property_id for property_id in ids if property_id in won], expires_at
+
+
+def release(user, property_ids=None):
+    """Give back a moderator's leases, all of them when property_ids is None."""
+    from .models import ModerationTicket
+
+    tickets = ModerationTicket.objects.filter(claimed_by=user)
+    if property_ids is not None:
+        tickets = tickets.filter(property_id__in=property_ids)
+    return tickets.update(claimed_by=None, lease_expires_at=None)
@@ -0,0 +1,162 @@
+"""
+Price-drop alerts for favorited properties.
+
+Rent changes are recorded as `PriceChange` rows by `Property.save`,
+whatever the edit path. The `send_price_drop_alerts` Celery task
+periodically claims the pending changes, keeps the properties whose rent
+went down overall, and walks their favorites in chunks ordered by user.
+Each user gets a single email listing every dropped property they follow,
+and emails are sent in batches over one mail connection. If sending
+fails, the changes are released for the next run together with a cursor,
+the id of the last user emailed: the retry only walks the followers after
+it, so nobody gets the same alert twice.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PriceChange, Property
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, 'PRICE_ALERT_BATCH_SIZE', 100)
+CHUNK_SIZE = 2000
+
+
+def record_price_change(property_obj, old_rent):
+    """Record a rent change of a saved property, old_rent being the rent it was loaded with."""
+    if old_rent is None or property_obj.monthly_rent == old_rent:
+        return None
+    return PriceChange.objects.create(
+        property=property_obj, old_rent=old_rent, new_rent=property_obj.monthly_rent
+    )
+
+
+def claim_changes():
+    """Mark the pending changes as processed and return them, oldest first."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(PriceChange.objects.filter(processed_at=None).values_list('pk', flat=True))
+        if not ids:
+            return []
+        PriceChange.objects.filter(pk__in=ids, processed_at=None).update(processed_at=now)
+    return list(PriceChange.objects.filter(pk__in=ids, processed_at=now).order_by('changed_at', 'pk'))
+
+
+def price_drops(changes):
+    """Return {property_id: (title, old_rent, new_rent)} for published properties now cheaper."""
+    first_rent = {}
+    for change in changes:
+        first_rent.setdefault(change.property_id, change.old_rent)
+
+    drops = {}
+    current = Property.objects.filter(pk__in=first_rent, status='PUBLISHED')
+    for property_id, title, rent in current.values_list('pk', 'title', 'monthly_rent'):
+        if rent < first_rent[property_id]:
+            drops[property_id] = (title, first_rent[property_id], rent)
+    return drops
+
+
+def alert_cursors(changes):
+    """
+    Return {property_id: user id} of the followers already emailed.
+
+    A property changed again since the interrupted run has a change without
+    cursor, and all its followers are emailed.
+    """
+    cursors = {}
+    for change in changes:
+        known = cursors.get(change.property_id, change.alert_cursor)
+        if known is None or change.alert_cursor is None:
+            cursors[change.property_id] = None
+        else:
+            cursors[change.property_id] = min(known, change.alert_cursor)
+    return cursors
+
+
+def release_changes(changes, drops, cursors, last_user_id):
+    """Hand back the changes of dropped properties, remembering who was emailed."""
+    by_cursor = {}
+    for change in changes:
+        if change.property_id not in drops:
+            continue
+        cursor = cursors.get(change.property_id)
+        if last_user_id is not None:
+            cursor = last_user_id if cursor is None else max(cursor, last_user_id)
+        by_cursor.setdefault(cursor, []).append(change.pk)
+    for cursor, ids in by_cursor.items():
+        PriceChange.objects.filter(pk__in=ids).update(processed_at=None, alert_cursor=cursor)
+    return sum(len(ids) for ids in by_cursor.values())
+
+
+def _recipients(property_ids, cursors):
+    """Yield (user, [property_id, ...]) for every user following the properties and not yet emailed."""
+    from apps.favorites.models import Favorite
+
+    followers = Q(property_id__in=[pk for pk in property_ids if cursors.get(pk) is None])
+    for property_id in property_ids:
+        if cursors.get(property_id) is not None:
+            followers |= Q(property_id=property_id, user_id__gt=cursors[property_id])
+
+    rows = Favorite.objects.filter(followers, user__is_active=True).order_by(
+        'user_id', 'property_id'
+    ).values_list(
+        'user_id', 'user__email', 'user__first_name', 'property_id'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+    user, followed = None, []
+    for user_id, email, first_name, property_id in rows:
+        if user is not None and user[0] != user_id:
+            yield user, followed
+            followed = []
+        user = (user_id, email, first_name)
+        followed.append(property_id)
+    if user is not None:
+        yield user, followed
+
+
+def build_email(user, property_ids, drops):
+    _, email, first_name = user
+    lines = [f"Bonjour {first_name},", '', "Le loyer de biens de vos favoris a baissé :", '']
+    for property_id in property_ids:
+        title, old_rent, new_rent = drops[property_id]
+        lines.append(f"- {title} : {old_rent:.0f} → {new_rent:.0f} par mois")
+    if len(property_ids) > 1:
+        subject = 'Baisse de prix sur vos favoris'
+    else:
+        subject = f'Baisse de prix : {drops[property_ids[0]][0]}'
+    return EmailMessage(subject, '\n'.join(lines), settings.DEFAULT_FROM_EMAIL, [email])
+
+
+def send_alerts():
+    """Notify the followers of properties whose rent dropped. Returns the number of emails sent."""
+    changes = claim_changes()
+    drops = price_drops(changes)
+    if not drops:
+        return 0
+    cursors = alert_cursors(changes)
+
+    sent = 0
+    batch = []
+    # Recipients come ordered by user: everyone up to this id was emailed
+    last_user_id = None
+    try:
+        with get_connection() as connection:
+            for user, property_ids in _recipients(list(drops), cursors):
+                batch.append(build_email(user, property_ids, drops))
+                if len(batch) >= BATCH_SIZE:
+                    sent += connection.send_messages(batch) or 0
+                    batch = []
+                    last_user_id = user[0]
+            if batch:
+                sent += connection.send_messages(batch) or 0
+    except Exception:
+        released = release_changes(changes, drops, cursors, last_user_id)
+        logger.exception('Price-drop alerts failed after %s emails, %s changes released.', sent, released)
+        raise
+    logger.info('Price-drop alerts: %s properties, %s emails.', len(drops), sent)
+    return sent
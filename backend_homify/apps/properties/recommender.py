@@ -0,0 +1,251 @@
+"""
+Similar-properties recommender.
+
+Published properties are embedded in a NumPy feature matrix (rent,
+surface, rooms, bedrooms, furnished, type, coordinates and an amenity
+bitvector). The k nearest neighbours of every property are precomputed
+into `SimilarProperty` rows so the `similar` endpoint is a single indexed
+lookup. Celery tasks keep the neighbour lists up to date incrementally
+and rebuild them nightly.
+"""
+import math
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Property, SimilarProperty
+
+NEIGHBOURS = getattr(settings, 'SIMILAR_PROPERTIES_COUNT', 12)
+INDEX_TTL = getattr(settings, 'SIMILAR_PROPERTIES_INDEX_TTL', 600)
+BATCH_SIZE = 512
+
+TYPES = [choice for choice, _ in Property.TYPE_CHOICES]
+
+# Relative importance of each feature group
+WEIGHTS = {
+    'rent': 2.0,
+    'surface': 1.0,
+    'rooms': 0.7,
+    'bedrooms': 0.7,
+    'furnished': 0.5,
+    'type': 3.0,
+    'location': 2.0,
+    'amenities': 1.0,
+}
+
+# Coordinates are scaled so that this many kilometres count as one unit
+LOCATION_SCALE_KM = 5.0
+
+
+def _raw_features(property_ids=None):
+    """Return value rows and {property_id: amenity ids} for published properties."""
+    queryset = Property.objects.filter(status='PUBLISHED')
+    if property_ids is not None:
+        queryset = queryset.filter(pk__in=property_ids)
+
+    rows = list(queryset.values_list(
+        'id', 'monthly_rent', 'surface', 'number_of_rooms', 'number_of_bedrooms',
+        'furnished', 'type', 'address__latitude', 'address__longitude',
+    ))
+
+    amenities = {}
+    links = Property.amenities.through.objects.filter(property_id__in=[row[0] for row in rows])
+    for property_id, amenity_id in links.values_list('property_id', 'amenity_id'):
+        amenities.setdefault(property_id, set()).add(amenity_id)
+
+    return rows, amenities
+
+
+class FeatureIndex:
+    """In-memory feature matrix of published properties."""
+
+    def __init__(self):
+        rows, amenities = _raw_features()
+        self.amenity_ids = sorted({a for ids in amenities.values() for a in ids})
+        self.amenity_column = {amenity_id: i for i, amenity_id in enumerate(self.amenity_ids)}
+
+        numeric = np.array(
+            [[math.log1p(float(row[1])), math.log1p(row[2]), row[3], row[4]] for row in rows],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        self.mean = numeric.mean(axis=0) if len(rows) else np.zeros(4)
+        self.std = numeric.std(axis=0) if len(rows) else np.ones(4)
+        self.std[self.std == 0] = 1.0
+
+        coordinates = [(row[7], row[8]) for row in rows if row[7] is not None and row[8] is not None]
+        self.center = np.mean(coordinates, axis=0) if coordinates else np.zeros(2)
+
+        self.ids = [row[0] for row in rows]
+        self.row_of = {property_id: i for i, property_id in enumerate(self.ids)}
+        self.matrix = np.array(
+            [self.vector(row, amenities.get(row[0], ())) for row in rows], dtype=np.float32
+        ).reshape(len(rows), self.dimensions)
+        self.active = np.ones(len(rows), dtype=bool)
+        self.built_at = time.monotonic()
+
+    @property
+    def dimensions(self):
+        return 5 + len(TYPES) + 2 + len(self.amenity_ids)
+
+    def vector(self, row, amenity_ids):
+        """Embed one `_raw_features` row."""
+        _, rent, surface, rooms, bedrooms, furnished, property_type, lat, lng = row
+        numeric = (np.array(
+            [math.log1p(float(rent)), math.log1p(surface), rooms, bedrooms]
+        ) - self.mean) / self.std
+
+        type_vector = np.zeros(len(TYPES))
+        if property_type in TYPES:
+            type_vector[TYPES.index(property_type)] = WEIGHTS['type']
+
+        # Equirectangular projection around the catalogue centre, in km
+        if lat is None or lng is None:
+            lat, lng = self.center
+        km_per_degree = 111.32
+        location = np.array([
+            (lat - self.center[0]) * km_per_degree,
+            (lng - self.center[1]) * km_per_degree * math.cos(math.radians(self.center[0])),
+        ]) / LOCATION_SCALE_KM * WEIGHTS['location']
+
+        amenity_vector = np.zeros(len(self.amenity_ids))
+        for amenity_id in amenity_ids:
+            column = self.amenity_column.get(amenity_id)
+            if column is not None:
+                amenity_vector[column] = 1.0
+        if len(self.amenity_ids):
+            amenity_vector *= WEIGHTS['amenities'] / math.sqrt(len(self.amenity_ids))
+
+        return np.concatenate([
+            numeric * [WEIGHTS['rent'], WEIGHTS['surface'], WEIGHTS['rooms'], WEIGHTS['bedrooms']],
+            [WEIGHTS['furnished'] if furnished else 0.0],
+            type_vector,
+            location,
+            amenity_vector,
+        ])
+
+    def upsert(self, property_id):
+        """Refresh the vector of a property; return False if it is not published."""
+        rows, amenities = _raw_features([property_id])
+        row = self.row_of.get(property_id)
+        if not rows:
+            if row is not None:
+                self.active[row] = False
+            return False
+
+        vector = self.vector(rows[0], amenities.get(property_id, ()))
+        if row is None:
+            self.row_of[property_id] = len(self.ids)
+            self.ids.append(property_id)
+            self.matrix = np.vstack([self.matrix, vector.astype(np.float32)])
+            self.active = np.append(self.active, True)
+        else:
+            self.matrix[row] = vector
+            self.active[row] = True
+        return True
+
+    def distances(self, vectors):
+        """Return squared distances from each vector to every indexed row."""
+        vectors = np.atleast_2d(vectors)
+        squared = (
+            (vectors ** 2).sum(axis=1)[:, None]
+            - 2 * vectors @ self.matrix.T
+            + (self.matrix ** 2).sum(axis=1)[None, :]
+        )
+        squared[:, ~self.active] = np.inf
+        return np.maximum(squared, 0)
+
+    def neighbours(self, rows, k=NEIGHBOURS):
+        """Return {property_id: [(similar_id, distance), ...]} for the given rows."""
+        result = {}
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            distances = self.distances(self.matrix[batch])
+            distances[np.arange(len(batch)), batch] = np.inf
+
+            count = min(k, len(self.ids) - 1)
+            if count <= 0:
+                result.update({self.ids[row]: [] for row in batch})
+                continue
+            nearest = np.argpartition(distances, count - 1, axis=1)[:, :count]
+            for i, row in enumerate(batch):
+                order = nearest[i][np.argsort(distances[i, nearest[i]])]
+                result[self.ids[row]] = [
+                    (self.ids[column], float(math.sqrt(distances[i, column])))
+                    for column in order if np.isfinite(distances[i, column])
+                ]
+        return result
+
+
+_index = None
+
+
+def get_index(rebuild=False):
+    """Return this process's feature index, rebuilding it when stale."""
+    global _index
+    if rebuild or _index is None or time.monotonic() - _index.built_at > INDEX_TTL:
+        _index = FeatureIndex()
+    return _index
+
+
+def _store(neighbours):
+    """Replace the stored neighbour lists of the given properties."""
+    SimilarProperty.objects.filter(property_id__in=list(neighbours)).delete()
+    SimilarProperty.objects.bulk_create([
+        SimilarProperty(property_id=property_id, similar_id=similar_id, distance=distance, rank=rank)
+        for property_id, items in neighbours.items()
+        for rank, (similar_id, distance) in enumerate(items)
+    ], batch_size=1000)
+
+
+def rebuild_all():
+    """Recompute the neighbour lists of every published property."""
+    index = get_index(rebuild=True)
+    neighbours = index.neighbours(list(range(len(index.ids))))
+    with transaction.atomic():
+        SimilarProperty.objects.all().delete()
+        _store(neighbours)
+    return len(neighbours)
+
+
+def update_property(property_id):
+    """
+    Incrementally refresh the recommendations after a listing changed.
+
+    The property's own list is recomputed, and so is the list of every
+    property it now beats or no longer belongs to.
+    """
+    index = get_index()
+    published = index.upsert(property_id)
+
+    # Lists that contained the property may have to drop or reorder it
+    affected = set(SimilarProperty.objects.filter(
+        similar_id=property_id
+    ).values_list('property_id', flat=True))
+
+    if published:
+        row = index.row_of[property_id]
+        distances = np.sqrt(index.distances(index.matrix[row])[0])
+        worst = np.full(len(index.ids), np.inf)
+        for other_id, distance in SimilarProperty.objects.filter(
+            rank=NEIGHBOURS - 1
+        ).values_list('property_id', 'distance'):
+            if other_id in index.row_of:
+                worst[index.row_of[other_id]] = distance
+        beaten = np.nonzero((distances < worst) & index.active)[0]
+        affected.update(index.ids[other_row] for other_row in beaten if other_row != row)
+
+    rows = [index.row_of[other_id] for other_id in affected
+            if other_id in index.row_of and index.active[index.row_of[other_id]]]
+    if published:
+        rows.append(index.row_of[property_id])
+
+    neighbours = index.neighbours(rows)
+    with transaction.atomic():
+        if not published:
+            SimilarProperty.objects.filter(property_id=property_id).delete()
+        stale = affected - set(neighbours)
+        SimilarProperty.objects.filter(property_id__in=stale).delete()
+        _store(neighbours)
+    return len(neighbours)
@@ -0,0 +1,152 @@
+"""
+Full-text search index for properties.
+
+On PostgreSQL the index is a `search_vector` tsvector column with a GIN
+index, weighted title (A) > city/district (B) > description (C). On SQLite
+it is an FTS5 shadow table keyed by the property id, ranked with bm25
+using the same relative weights. Both are created by migration and kept
+in sync by the signals in `signals.py`.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+PROPERTY_TABLE = 'properties_property'
+ADDRESS_TABLE = 'properties_address'
+FTS_TABLE = 'properties_property_fts'
+
+SEARCH_CONFIG = getattr(settings, 'PROPERTY_SEARCH_CONFIG', 'french')
+
+# bm25 column weights for title, location and description
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def is_supported(using=None):
+    """Return True when the current database has a full-text index."""
+    return (using or connection).vendor in ('postgresql', 'sqlite')
+
+
+def build_fts5_query(terms):
+    """Turn free text into a safe FTS5 query of prefix-matched tokens."""
+    tokens = re.findall(r'\w+', terms)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def create_index(schema_editor):
+    """Create the index structures for the schema editor's database."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'ALTER TABLE {PROPERTY_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS properties_property_search_idx '
+            f'ON {PROPERTY_TABLE} USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            f"title, location, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_index(schema_editor):
+    """Drop the index structures created by `create_index`."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS properties_property_search_idx')
+        schema_editor.execute(f'ALTER TABLE {PROPERTY_TABLE} DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def index_properties(property_ids=None, using=None):
+    """(Re)index the given properties, or every property when ids is None."""
+    conn = using or connection
+    if property_ids is not None:
+        property_ids = list(property_ids)
+        if not property_ids:
+            return
+
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            sql = (
+                f'UPDATE {PROPERTY_TABLE} AS p SET search_vector = '
+                f"setweight(to_tsvector(%s::regconfig, coalesce(p.title, '')), 'A') || "
+                f'setweight(to_tsvector(%s::regconfig, coalesce(('
+                f"SELECT a.city || ' ' || a.district FROM {ADDRESS_TABLE} a WHERE a.property_id = p.id"
+                f"), '')), 'B') || "
+                f"setweight(to_tsvector(%s::regconfig, coalesce(p.description, '')), 'C')"
+            )
+            params = [SEARCH_CONFIG] * 3
+            if property_ids is not None:
+                sql += ' WHERE p.id = ANY(%s)'
+                params.append(property_ids)
+            cursor.execute(sql, params)
+
+        elif conn.vendor == 'sqlite':
+            select = (
+                f'INSERT INTO {FTS_TABLE} (rowid, title, location, description) '
+                f"SELECT p.id, p.title, coalesce(a.city, '') || ' ' || coalesce(a.district, ''), "
+                f'p.description FROM {PROPERTY_TABLE} p '
+                f'LEFT JOIN {ADDRESS_TABLE} a ON a.property_id = p.id'
+            )
+            if property_ids is None:
+                cursor.execute(f'DELETE FROM {FTS_TABLE}')
+                cursor.execute(select)
+            else:
+                placeholders = ', '.join(['%s'] * len(property_ids))
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', property_ids
+                )
+                cursor.execute(f'{select} WHERE p.id IN ({placeholders})', property_ids)
+
+
+def remove_properties(property_ids, using=None):
+    """Drop deleted properties from the index."""
+    conn = using or connection
+    property_ids = list(property_ids)
+    if conn.vendor != 'sqlite' or not property_ids:
+        # The PostgreSQL vector lives on the row itself
+        return
+
+    placeholders = ', '.join(['%s'] * len(property_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', property_ids)
+
+
+def search_properties(queryset, terms):
+    """Restrict queryset to properties matching terms, annotated with `search_rank`."""
+    vendor = connection.vendor
+
+    if vendor == 'postgresql':
+        tsquery = 'websearch_to_tsquery(%s::regconfig, %s)'
+        params = (SEARCH_CONFIG, terms)
+        match = RawSQL(
+            f'{PROPERTY_TABLE}.search_vector @@ {tsquery}', params, output_field=BooleanField()
+        )
+        rank = RawSQL(
+            f'ts_rank({PROPERTY_TABLE}.search_vector, {tsquery})', params, output_field=FloatField()
+        )
+
+    else:
+        query = build_fts5_query(terms)
+        if not query:
+            return queryset.none()
+
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        match = RawSQL(
+            f'{PROPERTY_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+            (query,), output_field=BooleanField()
+        )
+        # bm25 is lower for better matches
+        rank = RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {PROPERTY_TABLE}.id)',
+            (query,), output_field=FloatField()
+        )
+
+    return queryset.filter(match).annotate(search_rank=rank)
@@ -1,11 +1,71 @@
 """
 Serializers for Property models.
 """
+from django.db import models
 from rest_framework import serializers
 from .models import Property, Address, Photo
 from apps.users.serializers import UserSerializer
 
 
+def resolve_property_list(properties, request=None):
+    """
+    Attach primary photo and favorite flag to a page of properties.
+    
+    Uses the `photos` prefetch cache when present, otherwise loads the
+    photos of the whole page in one query; the favorite flags come from
+    the user's cached favorite set.
+    """
+    properties = [obj for obj in properties if obj is not None]
+    if not properties:
+        return properties
+    
+    missing = {obj.pk for obj in properties
+               if 'photos' not in getattr(obj, '_prefetched_objects_cache', {})}
+    photos_by_property = {}
+    if missing:
+        for photo in Photo.objects.filter(property_id__in=missing):
+            photos_by_property.setdefault(photo.property_id, []).append(photo)
+    
+    for obj in properties:
+        if obj.pk in missing:
+            photos = photos_by_property.get(obj.pk, [])
+        else:
+            photos = list(obj.photos.all())
+        primary = next((photo for photo in photos if photo.is_primary), None)
+        obj._primary_photo = primary or (photos[0] if photos else None)
+    
+    favorite_ids = set()
+    if request and request.user.is_authenticated:
+        from apps.favorites import cache as favorites_cache
+        favorite_ids = favorites_cache.favorite_ids(request.user.pk, [obj.pk for obj in properties])
+    
+    for obj in properties:
+        obj._is_favorite = obj.pk in favorite_ids
+    
+    return properties
+
+
+class PropertyListResolverSerializer(serializers.ListSerializer):
+    """List serializer resolving photos and favorites for the whole page."""
+    
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        resolve_property_list(items, self.context.get('request'))
+        return super().to_representation(items)
+
+
+class PropertyRelatedListSerializer(serializers.ListSerializer):
+    """List serializer resolving the nested `property` of every item at once."""
+    
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        resolve_property_list(
+            [getattr(item, 'property', None) for item in items],
+            self.context.get('request')
+        )
+        return super().to_representation(items)
+
+
 class AddressSerializer(serializers.ModelSerializer):
     """Serializer for Address model."""
     
@@ -22,10 +82,11 @@ class PhotoSerializer(serializers.ModelSerializer):
     
     url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Photo
-        fields = ('id', 'url', 'thumbnail_url', 'is_primary', 'order', 'uploaded_at')
+        fields = ('id', 'url', 'thumbnail_url', 'srcset', 'is_primary', 'order', 'uploaded_at')
         read_only_fields = ('id', 'uploaded_at')
     
     def get_url(self, obj):
@@ -43,6 +104,21 @@ class PhotoSerializer(serializers.ModelSerializer):
         elif obj.image and request:
             return request.build_absolute_uri(obj.image.url)
         return None
+    
+    def get_srcset(self, obj):
+        """Get URLs and sizes of the responsive variants."""
+        request = self.context.get('request')
+        if not request:
+            return {}
+        
+        srcset = {}
+        for variant, files in obj.variants.items():
+            entry = {'width': files.get('width'), 'height': files.get('height')}
+            for extension in ('webp', 'jpeg'):
+                if files.get(extension):
+                    entry[extension] = request.build_absolute_uri(obj.image.storage.url(files[extension]))
+            srcset[variant] = entry
+        return srcset
 
 
 class PropertyListSerializer(serializers.ModelSerializer):
@@ -56,22 +132,31 @@ class PropertyListSerializer(serializers.ModelSerializer):
         model = Property
         fields = ('id', 'title', 'type', 'monthly_rent', 'surface', 'number_of_rooms',
                   'address', 'primary_photo', 'furnished', 'published_at', 'is_favorite')
+        list_serializer_class = PropertyListResolverSerializer
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        distance = getattr(instance, 'distance_km', None)
+        if distance is not None:
+            data['distance_km'] = round(distance, 2)
+        return data
     
     def get_primary_photo(self, obj):
         """Get primary photo."""
-        photo = obj.photos.filter(is_primary=True).first()
-        if not photo:
-            photo = obj.photos.first()
+        if not hasattr(obj, '_primary_photo'):
+            resolve_property_list([obj], self.context.get('request'))
         
-        if photo:
-            return PhotoSerializer(photo, context=self.context).data
+        if obj._primary_photo:
+            return PhotoSerializer(obj._primary_photo, context=self.context).data
         return None
     
     def get_is_favorite(self, obj):
         """Check if property is in user's favorites."""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.favorites.filter(user=request.user).exists()
+            if not hasattr(obj, '_is_favorite'):
+                resolve_property_list([obj], request)
+            return obj._is_favorite
         return False
 
 
@@ -91,6 +176,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
                   'monthly_rent', 'charges', 'charges_included', 'deposit', 'agency_fees',
                   'address', 'photos', 'amenities', 'landlord', 'view_count', 'status',
                   'published_at', 'updated_at', 'is_favorite')
+        list_serializer_class = PropertyListResolverSerializer
     
     def get_amenities(self, obj):
         """Get property amenities."""
@@ -101,10 +187,47 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
         """Check if property is in user's favorites."""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.favorites.filter(user=request.user).exists()
+            if hasattr(obj, '_is_favorite'):
+                return obj._is_favorite
+            from apps.favorites import cache as favorites_cache
+            return obj.pk in favorites_cache.favorite_ids(request.user.pk, [obj.pk])
         return False
 
 
+class PropertyModerationSerializer(serializers.ModelSerializer):
+    """Serializer for the moderation queue, fed by a prefetched queryset."""
+    
+    address = AddressSerializer(read_only=True)
+    landlord = serializers.SerializerMethodField()
+    photos = serializers.SerializerMethodField()
+    amenities = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Property
+        fields = ('id', 'title', 'description', 'type', 'surface', 'number_of_rooms',
+                  'furnished', 'monthly_rent', 'address', 'landlord', 'photos', 'amenities',
+                  'status', 'rejection_reason', 'created_at', 'updated_at')
+    
+    def get_landlord(self, obj):
+        """Get landlord id, name and email."""
+        landlord = obj.landlord
+        return {'id': landlord.pk, 'email': landlord.email, 'full_name': landlord.get_full_name()}
+    
+    def get_photos(self, obj):
+        """Get thumbnail URLs of the photos."""
+        request = self.context.get('request')
+        if not request:
+            return []
+        return [
+            request.build_absolute_uri((photo.thumbnail or photo.image).url)
+            for photo in obj.photos.all() if photo.thumbnail or photo.image
+        ]
+    
+    def get_amenities(self, obj):
+        """Get amenity names."""
+        return [amenity.name for amenity in obj.amenities.all()]
+
+
 class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating properties."""
     
@@ -0,0 +1,220 @@
+"""
+Signal handlers keeping derived property data in sync.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import amenity_mask, analytics, cache, listing_index, moderation_queue, search
+from .models import Property, Address, Photo
+from .tasks import update_similar_properties, update_market_stats, generate_photo_variants
+from apps.amenities.models import Amenity
+from rental_project.celery import enqueue
+
+SIMILARITY_FIELDS = {
+    'status', 'type', 'monthly_rent', 'surface', 'number_of_rooms',
+    'number_of_bedrooms', 'furnished',
+}
+
+SEARCH_FIELDS = {'title', 'description'}
+
+MARKET_FIELDS = {'status', 'type', 'monthly_rent', 'surface'}
+
+LISTING_PHOTO_FIELDS = {'image', 'is_primary', 'order'}
+
+
+@receiver(post_save, sender=Property)
+def index_property(sender, instance, update_fields=None, **kwargs):
+    """Reindex a property when its searchable text changes."""
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(lambda: search.index_properties([instance.pk]))
+
+
+@receiver(post_delete, sender=Property)
+def unindex_property(sender, instance, **kwargs):
+    """Remove a deleted property from the search index."""
+    search.remove_properties([instance.pk])
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+def index_property_address(sender, instance, **kwargs):
+    """Reindex a property when its city or district changes."""
+    property_id = instance.property_id
+    transaction.on_commit(lambda: search.index_properties([property_id]))
+
+
+@receiver(post_save, sender=Property)
+def sync_listing(sender, instance, update_fields=None, **kwargs):
+    """Refresh the listing table row of a public property."""
+    if instance.status != 'PUBLISHED' and not instance.was_published:
+        return
+    if update_fields and set(update_fields) == {'view_count'}:
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: listing_index.sync_properties([property_id]))
+
+
+@receiver(post_delete, sender=Property)
+def remove_listing(sender, instance, **kwargs):
+    """Remove a deleted property from the listing table."""
+    listing_index.remove_properties([instance.pk])
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def sync_listing_related(sender, instance, update_fields=None, **kwargs):
+    """Refresh the listing table row when an address or photo changes."""
+    if sender is Photo and update_fields and not LISTING_PHOTO_FIELDS.intersection(update_fields):
+        return
+    property_id = instance.property_id
+    transaction.on_commit(lambda: listing_index.sync_properties([property_id]))
+
+
+@receiver(m2m_changed, sender=Amenity.properties.through)
+def sync_amenity_links(sender, instance, action, pk_set, **kwargs):
+    """Refresh the amenity bitmask, listing rows and cached responses of relinked properties."""
+    if action == 'pre_clear' and isinstance(instance, Amenity):
+        # Remember which properties lose the amenity, post_clear does not say
+        instance._cleared_property_ids = list(instance.properties.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, Property):
+        property_ids = [instance.pk]
+    elif action == 'post_clear':
+        property_ids = getattr(instance, '_cleared_property_ids', [])
+    else:
+        property_ids = list(pk_set or ())
+    if not property_ids:
+        return
+
+    amenity_mask.refresh_masks(property_ids)
+
+    def sync():
+        listing_index.sync_properties(property_ids)
+        cache.invalidate(property_ids)
+
+    transaction.on_commit(sync)
+
+
+@receiver(pre_delete, sender=Amenity)
+def remember_amenity_properties(sender, instance, **kwargs):
+    """Remember the properties of an amenity, its links are deleted without m2m signals."""
+    instance._cleared_property_ids = list(instance.properties.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Amenity)
+def refresh_amenity_mask_deleted(sender, instance, **kwargs):
+    """Clear the bit of a deleted amenity."""
+    property_ids = getattr(instance, '_cleared_property_ids', [])
+    amenity_mask.refresh_masks(property_ids)
+    transaction.on_commit(lambda: listing_index.sync_properties(property_ids))
+    transaction.on_commit(lambda: cache.invalidate(property_ids))
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_cache(sender, instance, update_fields=None, **kwargs):
+    """Drop cached responses when a public property changes."""
+    if instance.status != 'PUBLISHED' and not instance.was_published:
+        return
+    if update_fields and set(update_fields) == {'view_count'}:
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: cache.invalidate([property_id]))
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def invalidate_related_cache(sender, instance, **kwargs):
+    """Drop cached responses when an address or photo changes."""
+    property_id = instance.property_id
+    transaction.on_commit(lambda: cache.invalidate([property_id]))
+
+
+@receiver(post_save, sender=Property)
+def refresh_similar_properties(sender, instance, update_fields=None, **kwargs):
+    """Refresh recommendations when a public listing changes."""
+    if instance.status != 'PUBLISHED' and not instance.was_published:
+        return
+    if update_fields and not SIMILARITY_FIELDS.intersection(update_fields):
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: enqueue(update_similar_properties, property_id))
+
+
+@receiver(post_save, sender=Address)
+def refresh_similar_properties_address(sender, instance, **kwargs):
+    """Refresh recommendations when a listing moves."""
+    property_id = instance.property_id
+    transaction.on_commit(lambda: enqueue(update_similar_properties, property_id))
+
+
+@receiver(m2m_changed, sender=Amenity.properties.through)
+def refresh_similar_properties_amenities(sender, instance, action, pk_set, **kwargs):
+    """Refresh recommendations when amenity links change."""
+    if action not in ('post_add', 'post_remove') or not isinstance(instance, Property):
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: enqueue(update_similar_properties, property_id))
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def refresh_market_stats(sender, instance, update_fields=None, **kwargs):
+    """Update the market rollups on publish, unpublish, price or surface change."""
+    if instance.status != 'PUBLISHED' and not instance.was_published:
+        return
+    if update_fields and not MARKET_FIELDS.intersection(update_fields):
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: enqueue(update_market_stats, property_id))
+
+
+@receiver(post_save, sender=Address)
+def refresh_market_stats_address(sender, instance, **kwargs):
+    """Update the market rollups when a listing changes city or district."""
+    property_id = instance.property_id
+    transaction.on_commit(lambda: enqueue(update_market_stats, property_id))
+
+
+@receiver(post_save, sender=Property)
+def queue_for_moderation(sender, instance, **kwargs):
+    """Put a pending property in the moderation queue."""
+    if instance.status != 'PENDING':
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: moderation_queue.sync([property_id]))
+
+
+@receiver(post_save, sender=Photo)
+def queue_photo_variants(sender, instance, created, **kwargs):
+    """Generate responsive variants of newly uploaded photos."""
+    if not created:
+        return
+    photo_id = instance.pk
+    # Set by the upload paths that store files without decoding them
+    discard_unreadable = getattr(instance, '_discard_unreadable', False)
+    transaction.on_commit(lambda: enqueue(
+        generate_photo_variants, photo_id, discard_unreadable=discard_unreadable
+    ))
+
+
+@receiver(post_save, sender='favorites.Favorite')
+def record_favorite_event(sender, instance, created, **kwargs):
+    """Count a new favorite in the listing analytics."""
+    if created:
+        analytics.record_event(instance.property_id, 'favorites')
+
+
+@receiver(post_save, sender='chat.Message')
+def record_message_event(sender, instance, created, **kwargs):
+    """Count a new message in the listing analytics."""
+    if created:
+        analytics.record_event(instance.property_id, 'messages')
@@ -0,0 +1,108 @@
+"""
+Celery tasks for properties app.
+"""
+from celery import shared_task
+
+from .counters import flush_views
+from .images import StorageError
+
+
+@shared_task
+def flush_property_views():
+    """Flush buffered property views to the database."""
+    return flush_views()
+
+
+@shared_task
+def flush_property_analytics():
+    """Flush buffered listing events to the analytics buckets."""
+    from . import analytics
+    return analytics.flush_events()
+
+
+@shared_task
+def purge_property_analytics():
+    """Drop hourly analytics buckets past their retention."""
+    from . import analytics
+    return analytics.purge_hourly()
+
+
+@shared_task
+def update_similar_properties(property_id):
+    """Refresh the recommendations affected by a listing change."""
+    from . import recommender
+    return recommender.update_property(property_id)
+
+
+@shared_task
+def rebuild_similar_properties():
+    """Recompute the recommendations of every published property."""
+    from . import recommender
+    return recommender.rebuild_all()
+
+
+@shared_task
+def update_market_stats(property_id):
+    """Move a property's contribution to the market statistics."""
+    from . import market
+    return market.update_property(property_id)
+
+
+@shared_task
+def rebuild_market_stats():
+    """Recompute the market statistics exactly."""
+    from . import market
+    return market.rebuild_all()
+
+
+@shared_task
+def send_price_drop_alerts():
+    """Email the followers of properties whose rent went down."""
+    from .price_alerts import send_alerts
+    return send_alerts()
+
+
+@shared_task
+def notify_moderation(property_ids, decision):
+    """Email landlords the approval or rejection of their properties."""
+    from .moderation import notify_landlords
+    return notify_landlords(property_ids, decision)
+
+
+@shared_task
+def refresh_moderation_queue():
+    """Recompute the priority of pending properties and drop stale tickets."""
+    from .moderation_queue import sync
+    return sync()
+
+
+@shared_task(autoretry_for=(StorageError,), retry_backoff=True, max_retries=5)
+def generate_photo_variants(photo_id, force=False, discard_unreadable=False):
+    """
+    Generate the thumbnail, medium and large variants of a photo.
+    
+    Storage errors are retried. Photos that cannot be decoded are only
+    deleted when discard_unreadable is set, i.e. for uploads that were not
+    decoded before being stored.
+    """
+    from .images import generate_variants
+    from .models import Photo
+    
+    try:
+        photo = Photo.objects.get(pk=photo_id)
+    except Photo.DoesNotExist:
+        return False
+    
+    if not generate_variants(photo, force=force):
+        if discard_unreadable:
+            from .uploads import discard_photo
+            discard_photo(photo)
+        return False
+    return True
+
+
+@shared_task
+def purge_stale_photo_uploads():
+    """Abort resumable uploads left unfinished for a day."""
+    from .uploads import purge_stale_uploads
+    return purge_stale_uploads()
@@ -0,0 +1,161 @@
+"""
+Photo upload paths.
+
+`store_photos` handles regular multipart uploads: files are streamed to
+storage chunk by chunk and the rows inserted with a single bulk_create.
+Resumable uploads append raw chunks to a temporary file identified by a
+`PhotoUpload` session and become a Photo once complete. In both cases
+decoding and validation happen in the variant worker, which discards
+the photos of these paths it cannot read.
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, listing_index
+from .models import Photo, PhotoUpload
+from .tasks import generate_photo_variants
+from rental_project.celery import enqueue
+
+MAX_PHOTO_SIZE = getattr(settings, 'PHOTO_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+MAX_CHUNK_SIZE = getattr(settings, 'PHOTO_UPLOAD_MAX_CHUNK_SIZE', 1024 * 1024)
+UPLOAD_DIR = getattr(settings, 'PHOTO_UPLOAD_TEMP_DIR', os.path.join(settings.MEDIA_ROOT, 'uploads'))
+STREAM_BLOCK_SIZE = 64 * 1024
+MAX_PHOTOS_PER_PROPERTY = 10
+
+
+def _queue_variants(photo_ids, property_id):
+    for photo_id in photo_ids:
+        enqueue(generate_photo_variants, photo_id, discard_unreadable=True)
+    # bulk_create skips the model signals
+    listing_index.sync_properties([property_id])
+    cache.invalidate([property_id])
+
+
+def store_photos(property_obj, files):
+    """Stream files to storage and insert their Photo rows in one statement."""
+    has_photos = property_obj.photos.exists()
+    photos = [
+        Photo(property=property_obj, order=index, is_primary=(index == 0 and not has_photos))
+        for index in range(len(files))
+    ]
+
+    try:
+        for photo, file in zip(photos, files):
+            # FieldFile.save copies the upload to storage chunk by chunk
+            photo.image.save(file.name, file, save=False)
+
+        with transaction.atomic():
+            Photo.objects.bulk_create(photos)
+            photo_ids = [photo.pk for photo in photos]
+            transaction.on_commit(lambda: _queue_variants(photo_ids, property_obj.pk))
+    except Exception:
+        for photo in photos:
+            if photo.image:
+                photo.image.delete(save=False)
+        raise
+
+    return photos
+
+
+def discard_photo(photo):
+    """Delete an unreadable photo, promoting another one if it was primary."""
+    with transaction.atomic():
+        photo.image.delete(save=False)
+        photo.delete()
+        if photo.is_primary:
+            replacement = Photo.objects.filter(property_id=photo.property_id).first()
+            if replacement:
+                replacement.is_primary = True
+                replacement.save(update_fields=['is_primary'])
+
+
+def temp_path(upload):
+    return os.path.join(UPLOAD_DIR, f'{upload.pk}.part')
+
+
+def photo_slots_left(property_obj):
+    """Return how many photos, stored or being uploaded, the property can still get."""
+    used = property_obj.photos.count() + PhotoUpload.objects.filter(property=property_obj).count()
+    return MAX_PHOTOS_PER_PROPERTY - used
+
+
+def start_upload(property_obj, user, filename, size, content_type=''):
+    """Open a resumable upload session."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    upload = PhotoUpload.objects.create(
+        property=property_obj,
+        user=user,
+        filename=os.path.basename(filename),
+        content_type=content_type,
+        total_size=size,
+    )
+    open(temp_path(upload), 'wb').close()
+    return upload
+
+
+def write_chunk(upload, stream, offset, length):
+    """
+    Write `length` bytes read from stream at `offset` of the upload.
+    
+    The caller holds a row lock on the upload and has checked that offset
+    is its received size. Writing at the offset and truncating after the
+    chunk keeps a retried chunk from being stored twice.
+    """
+    remaining = length
+    with open(temp_path(upload), 'r+b') as part:
+        part.seek(offset)
+        while remaining > 0:
+            block = stream.read(min(STREAM_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            part.write(block)
+            remaining -= len(block)
+        part.truncate()
+        received = part.tell()
+
+    upload.received_size = received
+    upload.save(update_fields=['received_size', 'updated_at'])
+    return received
+
+
+def complete_upload(upload):
+    """Turn a fully received upload into a Photo."""
+    property_obj = upload.property
+    path = temp_path(upload)
+    with open(path, 'rb') as part:
+        photo = Photo(
+            property=property_obj,
+            order=property_obj.photos.count(),
+            is_primary=not property_obj.photos.exists(),
+        )
+        photo._discard_unreadable = True
+        photo.image.save(upload.filename, File(part), save=False)
+
+    with transaction.atomic():
+        photo.save()
+        upload.delete()
+    os.remove(path)
+    return photo
+
+
+def abort_upload(upload):
+    """Cancel a session and drop its received bytes."""
+    path = temp_path(upload)
+    upload.delete()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def purge_stale_uploads(max_age=timedelta(days=1)):
+    """Abort sessions that have not received data for max_age."""
+    stale = PhotoUpload.objects.filter(updated_at__lt=timezone.now() - max_age)
+    count = 0
+    for upload in stale:
+        abort_upload(upload)
+        count += 1
+    return count
@@ -1,27 +1,35 @@
 """
 Views for properties app.
 """
+from datetime import timedelta
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Q
-from .models import Property, Photo
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import Property, Photo, PhotoUpload, SimilarProperty
 from .serializers import (
     PropertyListSerializer, PropertyDetailSerializer,
-    PropertyCreateUpdateSerializer, PhotoSerializer
+    PropertyCreateUpdateSerializer, PropertyModerationSerializer, PhotoSerializer
 )
-from .filters import PropertyFilter
+from .filters import PropertyFilter, PropertySearchFilter, PropertyOrderingFilter
+from .counters import pending_views, record_view
+from . import analytics, cache, facets, listing_index, market, moderation, moderation_queue, uploads
 from .permissions import IsLandlordOrReadOnly, IsPropertyOwnerOrAdmin
 from apps.users.permissions import IsAdmin
+from rental_project.instrumentation import InstrumentedViewMixin
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """ViewSet for Property model."""
     
     permission_classes = (IsAuthenticatedOrReadOnly, IsLandlordOrReadOnly)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, PropertySearchFilter, PropertyOrderingFilter)
     filterset_class = PropertyFilter
     search_fields = ('title', 'description', 'address__city', 'address__district')
     ordering_fields = ('created_at', 'monthly_rent', 'surface', 'view_count')
@@ -59,13 +67,64 @@ class PropertyViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsPropertyOwnerOrAdmin()]
         return super().get_permissions()
     
+    def list(self, request, *args, **kwargs):
+        """List properties, serving anonymous requests from the shared cache."""
+        return cache.cached_response(request, 'list', lambda: self.render_list(*args, **kwargs))
+    
+    def render_list(self, *args, **kwargs):
+        """List published properties from the listing table when it covers the request."""
+        request = self.request
+        user = request.user
+        published_only = not user.is_authenticated or user.role not in ('ADMIN', 'LANDLORD')
+        
+        if published_only and listing_index.is_covered(request.query_params):
+            rows = listing_index.filter_listings(request.query_params)
+            if rows is not None:
+                page = self.paginate_queryset(rows)
+                properties = listing_index.load_properties(
+                    page if page is not None else rows, Property.objects.select_related('address')
+                )
+                serializer = self.get_serializer(properties, many=True)
+                if page is not None:
+                    return self.get_paginated_response(serializer.data)
+                return Response(serializer.data)
+        
+        return super().list(request, *args, **kwargs)
+    
     def retrieve(self, request, *args, **kwargs):
         """Retrieve property and increment view count."""
+        pk = kwargs[self.lookup_field]
+        response = cache.cached_response(request, 'retrieve', self.render_detail, pk=pk)
+        if response.get('X-Cache') == 'HIT':
+            # Cached responses skip get_object(), count the view here
+            record_view(pk)
+        return response
+    
+    def render_detail(self):
+        """Render the requested property and count the view."""
         instance = self.get_object()
         instance.increment_view_count()
+        
+        # Merge views still waiting in the buffer
+        instance.view_count += pending_views([instance.pk]).get(instance.pk, 0)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Get facet counts of published properties matching the filters."""
+        queryset = self.filter_queryset(Property.objects.filter(status='PUBLISHED'))
+        return Response(facets.get_facets(queryset, request.query_params))
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Get rent statistics of published properties by city, district and type."""
+        return Response(market.get_stats(
+            city=request.query_params.get('city'),
+            district=request.query_params.get('district'),
+            property_type=request.query_params.get('type'),
+        ))
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_properties(self, request):
         """Get current user's properties."""
@@ -79,6 +138,61 @@ class PropertyViewSet(viewsets.ModelViewSet):
         serializer = PropertyListSerializer(properties, many=True, context={'request': request})
         return Response(serializer.data)
     
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='my_properties/analytics',
+        permission_classes=[IsAuthenticated]
+    )
+    def my_properties_analytics(self, request):
+        """Get views, favorites and messages per day or hour for the user's properties."""
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in ('day', 'hour'):
+            return Response(
+                {'error': 'granularity doit valoir day ou hour.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        start, end = request.query_params.get('from'), request.query_params.get('to')
+        try:
+            if granularity == 'day':
+                end = parse_date(end) if end else timezone.localdate()
+                start = parse_date(start) if start else (end and end - timedelta(days=29))
+            else:
+                end = parse_datetime(end) if end else timezone.now()
+                start = parse_datetime(start) if start else (end and end - timedelta(hours=47))
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return Response(
+                {'error': 'Dates invalides (format AAAA-MM-JJ, ou ISO 8601 pour granularity=hour).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if granularity == 'hour':
+            start, end = (
+                value if timezone.is_aware(value) else timezone.make_aware(value)
+                for value in (start, end)
+            )
+            start = analytics.hour_of(start)
+        
+        property_id = request.query_params.get('property')
+        if property_id is not None and not property_id.isdigit():
+            return Response(
+                {'error': 'Identifiant d\'annonce invalide.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'granularity': granularity,
+            'from': start,
+            'to': end,
+            'properties': analytics.landlord_series(
+                request.user, granularity, start, end,
+                property_id=int(property_id) if property_id else None
+            ),
+        })
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def upload_photos(self, request, pk=None):
         """Upload photos for a property."""
@@ -105,19 +219,135 @@ class PropertyViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        photos = []
-        for index, file in enumerate(files):
-            photo = Photo.objects.create(
-                property=property_obj,
-                image=file,
-                order=index,
-                is_primary=(index == 0 and not property_obj.photos.exists())
-            )
-            photos.append(photo)
+        for file in files:
+            if file.size > uploads.MAX_PHOTO_SIZE:
+                return Response(
+                    {'error': f'La photo {file.name} dépasse la taille maximale de 5 Mo.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not (file.content_type or '').startswith('image/'):
+                return Response(
+                    {'error': f'Le fichier {file.name} n\'est pas une image.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        photos = uploads.store_photos(property_obj, files)
         
         serializer = PhotoSerializer(photos, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=True, methods=['post'], url_path='uploads', permission_classes=[IsAuthenticated])
+    def start_upload(self, request, pk=None):
+        """Open a resumable photo upload."""
+        property_obj = self.get_object()
+        
+        # Check permission
+        if property_obj.landlord != request.user and request.user.role != 'ADMIN':
+            return Response(
+                {'error': 'Vous n\'avez pas la permission de modifier cette annonce.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        filename = request.data.get('filename')
+        content_type = request.data.get('content_type', '')
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            size = 0
+        
+        if not filename or size <= 0:
+            return Response(
+                {'error': 'Les champs filename et size sont requis.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if size > uploads.MAX_PHOTO_SIZE:
+            return Response(
+                {'error': 'La photo dépasse la taille maximale de 5 Mo.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if content_type and not content_type.startswith('image/'):
+            return Response(
+                {'error': 'Le fichier n\'est pas une image.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if uploads.photo_slots_left(property_obj) <= 0:
+            return Response(
+                {'error': f'Maximum {uploads.MAX_PHOTOS_PER_PROPERTY} photos autorisées.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        upload = uploads.start_upload(property_obj, request.user, filename, size, content_type)
+        return Response(self.upload_state(upload), status=status.HTTP_201_CREATED)
+    
+    @action(
+        detail=True,
+        methods=['get', 'put', 'delete'],
+        url_path='uploads/(?P<upload_id>[0-9a-f-]+)',
+        permission_classes=[IsAuthenticated]
+    )
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        """Query, append to or cancel a resumable photo upload."""
+        try:
+            upload = PhotoUpload.objects.select_related('property').get(
+                id=upload_id, property_id=pk, user=request.user
+            )
+        except (PhotoUpload.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'Upload non trouvé.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if request.method == 'GET':
+            return Response(self.upload_state(upload))
+        
+        if request.method == 'DELETE':
+            uploads.abort_upload(upload)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        
+        try:
+            offset = int(request.headers.get('Upload-Offset'))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'En-tête Upload-Offset invalide.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if length <= 0 or length > uploads.MAX_CHUNK_SIZE:
+            return Response(
+                {'error': 'Taille de bloc invalide (1 Mo maximum).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Locked so that a retried or concurrent chunk at the same offset
+        # is rejected instead of written twice
+        with transaction.atomic():
+            upload = PhotoUpload.objects.select_for_update().get(pk=upload.pk)
+            if offset != upload.received_size:
+                return Response(self.upload_state(upload), status=status.HTTP_409_CONFLICT)
+            if offset + length > upload.total_size:
+                return Response(
+                    {'error': 'Le bloc dépasse la taille annoncée.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            uploads.write_chunk(upload, request.stream, offset, length)
+            if upload.received_size < upload.total_size:
+                return Response(self.upload_state(upload))
+            
+            photo = uploads.complete_upload(upload)
+        serializer = PhotoSerializer(photo, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @staticmethod
+    def upload_state(upload):
+        return {
+            'id': str(upload.id),
+            'filename': upload.filename,
+            'size': upload.total_size,
+            'offset': upload.received_size,
+        }
+    
     @action(detail=True, methods=['delete'], url_path='photos/(?P<photo_id>[^/.]+)')
     def delete_photo(self, request, pk=None, photo_id=None):
         """Delete a photo from property."""
@@ -145,11 +375,19 @@ class PropertyViewSet(viewsets.ModelViewSet):
         """Get similar properties."""
         property_obj = self.get_object()
         
-        similar_properties = Property.objects.filter(
-            status='PUBLISHED',
-            type=property_obj.type,
-            address__city=property_obj.address.city
-        ).exclude(id=property_obj.id)[:6]
+        links = SimilarProperty.objects.filter(
+            property=property_obj,
+            similar__status='PUBLISHED'
+        ).select_related('similar__address').order_by('rank')[:6]
+        similar_properties = [link.similar for link in links]
+        
+        # Not processed by the recommender yet
+        if not similar_properties:
+            similar_properties = Property.objects.filter(
+                status='PUBLISHED',
+                type=property_obj.type,
+                address__city=property_obj.address.city
+            ).exclude(id=property_obj.id).select_related('address')[:6]
         
         serializer = PropertyListSerializer(
             similar_properties,
@@ -159,7 +397,7 @@ class PropertyViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class AdminPropertyViewSet(viewsets.ModelViewSet):
+class AdminPropertyViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """Admin viewset for property moderation."""
     
     queryset = Property.objects.all().select_related('address', 'landlord')
@@ -169,19 +407,62 @@ class AdminPropertyViewSet(viewsets.ModelViewSet):
     filterset_fields = ('status', 'type', 'landlord')
     search_fields = ('title', 'landlord__email')
     
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Get hit/miss counters of the anonymous response cache."""
+        return Response(cache.get_stats())
+    
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get properties pending moderation."""
-        pending_properties = self.get_queryset().filter(status='PENDING')
+        pending_properties = self.get_queryset().filter(
+            status='PENDING'
+        ).prefetch_related('photos', 'amenities').order_by('created_at', 'id')
         
         page = self.paginate_queryset(pending_properties)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = PropertyModerationSerializer(page, many=True, context={'request': request})
             return self.get_paginated_response(serializer.data)
         
-        serializer = self.get_serializer(pending_properties, many=True)
+        serializer = PropertyModerationSerializer(pending_properties, many=True, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        """Lease the highest-priority pending properties to the moderator."""
+        count = request.data.get('count', 10)
+        if not isinstance(count, int) or isinstance(count, bool) or not 1 <= count <= moderation_queue.MAX_CLAIM:
+            return Response(
+                {'error': f'count doit être un entier entre 1 et {moderation_queue.MAX_CLAIM}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        ids, expires_at = moderation_queue.claim(request.user, count)
+        rank = {pk: position for position, pk in enumerate(ids)}
+        properties = sorted(
+            self.get_queryset().filter(pk__in=ids).prefetch_related('photos', 'amenities'),
+            key=lambda property_obj: rank[property_obj.pk]
+        )
+        serializer = PropertyModerationSerializer(properties, many=True, context={'request': request})
+        return Response({
+            'lease_expires_at': expires_at,
+            'properties': serializer.data,
+        })
+    
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """Give back leased properties, all of them when no ids are sent."""
+        ids = request.data.get('ids')
+        if ids is not None and (not isinstance(ids, list)
+                                or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)):
+            return Response(
+                {'error': "ids doit être une liste d'identifiants."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        released = moderation_queue.release(request.user, ids)
+        return Response({'released': released})
+    
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """Approve a property."""
@@ -193,10 +474,8 @@ class AdminPropertyViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        property_obj.status = 'PUBLISHED'
-        from django.utils import timezone
-        property_obj.published_at = timezone.now()
-        property_obj.save()
+        moderation.approve_properties([property_obj.pk])
+        property_obj.refresh_from_db()
         
         serializer = self.get_serializer(property_obj)
         return Response({
@@ -217,13 +496,50 @@ class AdminPropertyViewSet(viewsets.ModelViewSet):
         
         reason = request.data.get('reason', '')
         
-        property_obj.status = 'REJECTED'
-        property_obj.save()
-        
-        # TODO: Send notification to landlord with reason
+        moderation.reject_properties([property_obj.pk], reason)
+        property_obj.refresh_from_db()
         
         serializer = self.get_serializer(property_obj)
         return Response({
             'message': 'Annonce rejetée.',
             'property': serializer.data
         })
+    
+    def moderation_ids(self, request):
+        """Return the `ids` of a bulk moderation request, or an error response."""
+        ids = request.data.get('ids')
+        if (not isinstance(ids, list) or not ids or len(ids) > moderation.MAX_PROPERTY_IDS
+                or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)):
+            return None, Response(
+                {'error': f'ids doit être une liste de 1 à {moderation.MAX_PROPERTY_IDS} identifiants.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return ids, None
+    
+    @action(detail=False, methods=['post'])
+    def bulk_approve(self, request):
+        """Approve several pending properties at once."""
+        ids, error = self.moderation_ids(request)
+        if error:
+            return error
+        
+        approved = moderation.approve_properties(ids)
+        return Response({
+            'message': f'{len(approved)} annonce(s) approuvée(s) et publiée(s).',
+            'approved': sorted(approved),
+            'skipped': sorted(set(ids) - set(approved)),
+        })
+    
+    @action(detail=False, methods=['post'])
+    def bulk_reject(self, request):
+        """Reject several pending properties at once."""
+        ids, error = self.moderation_ids(request)
+        if error:
+            return error
+        
+        rejected = moderation.reject_properties(ids, request.data.get('reason', ''))
+        return Response({
+            'message': f'{len(rejected)} annonce(s) rejetée(s).',
+            'rejected': sorted(rejected),
+            'skipped': sorted(set(ids) - set(rejected)),
+        })
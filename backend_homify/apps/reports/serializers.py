@@ -4,7 +4,7 @@ Serializers for Report model.
 from rest_framework import serializers
 from .models import Report
 from apps.users.serializers import UserSerializer
-from apps.properties.serializers import PropertyListSerializer
+from apps.properties.serializers import PropertyListSerializer, PropertyRelatedListSerializer
 
 
 class ReportSerializer(serializers.ModelSerializer):
@@ -20,6 +20,7 @@ class ReportSerializer(serializers.ModelSerializer):
                   'reported_user_detail', 'reason', 'description', 'status', 
                   'created_at', 'resolved_at')
         read_only_fields = ('id', 'reporter', 'status', 'created_at', 'resolved_at')
+        list_serializer_class = PropertyRelatedListSerializer
 
 
 class ReportCreateSerializer(serializers.ModelSerializer):
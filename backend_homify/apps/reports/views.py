@@ -9,9 +9,10 @@ from django.utils import timezone
 from .models import Report
 from .serializers import ReportSerializer, ReportCreateSerializer
 from apps.users.permissions import IsAdmin
+from rental_project.instrumentation import InstrumentedViewMixin
 
 
-class ReportViewSet(viewsets.ModelViewSet):
+class ReportViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """ViewSet for Report model."""
     
     permission_classes = (IsAuthenticated,)
@@ -21,9 +22,9 @@ class ReportViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if user.role == 'ADMIN':
-            return Report.objects.all().select_related('reporter', 'property', 'reported_user')
+            return Report.objects.all().select_related('reporter', 'property__address', 'reported_user')
         else:
-            return Report.objects.filter(reporter=user).select_related('property', 'reported_user')
+            return Report.objects.filter(reporter=user).select_related('reporter', 'property__address', 'reported_user')
     
     def get_serializer_class(self):
         """Return appropriate serializer."""
@@ -0,0 +1,23 @@
+"""
+Admin configuration for saved searches app.
+"""
+from django.contrib import admin
+from .models import SavedSearch, SearchMatch
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    """Admin for SavedSearch model."""
+    
+    list_display = ('id', 'user', 'name', 'type', 'city', 'min_price', 'max_price', 'notify', 'created_at')
+    list_filter = ('type', 'notify', 'created_at')
+    search_fields = ('user__email', 'name', 'city')
+
+
+@admin.register(SearchMatch)
+class SearchMatchAdmin(admin.ModelAdmin):
+    """Admin for SearchMatch model."""
+    
+    list_display = ('id', 'search', 'user', 'property', 'matched_at', 'notified_at')
+    list_filter = ('matched_at',)
+    raw_id_fields = ('search', 'user', 'property')
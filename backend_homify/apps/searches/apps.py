@@ -0,0 +1,14 @@
+"""
+App configuration for saved searches app.
+"""
+from django.apps import AppConfig
+
+
+class SearchesConfig(AppConfig):
+    """Configuration for saved searches app."""
+    
+    name = 'apps.searches'
+    verbose_name = 'Recherches enregistrées'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
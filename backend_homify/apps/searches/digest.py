@@ -0,0 +1,75 @@
+"""
+Digest emails of saved search matches.
+
+Unnotified matches are walked in chunks ordered by user; every user with
+notifications enabled gets one email summarizing their new listings, and
+emails are sent in batches over one mail connection.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import SearchMatch
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, 'SAVED_SEARCH_DIGEST_BATCH_SIZE', 100)
+CHUNK_SIZE = 2000
+MAX_LISTINGS = 20
+
+
+def _pending():
+    """Yield (user, [(search name, title, rent), ...], match ids) per user."""
+    rows = SearchMatch.objects.filter(
+        notified_at=None, search__notify=True, user__is_active=True, property__status='PUBLISHED'
+    ).order_by('user_id', '-matched_at').values_list(
+        'pk', 'user_id', 'user__email', 'user__first_name',
+        'search__name', 'property__title', 'property__monthly_rent'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+    user, listings, ids = None, [], []
+    for pk, user_id, email, first_name, search_name, title, rent in rows:
+        if user is not None and user[0] != user_id:
+            yield user, listings, ids
+            listings, ids = [], []
+        user = (user_id, email, first_name)
+        listings.append((search_name, title, rent))
+        ids.append(pk)
+    if user is not None:
+        yield user, listings, ids
+
+
+def build_email(user, listings):
+    _, email, first_name = user
+    lines = [f"Bonjour {first_name},", '', "Nouvelles annonces correspondant à vos recherches :", '']
+    for search_name, title, rent in listings[:MAX_LISTINGS]:
+        lines.append(f"- [{search_name}] {title} : {rent:.0f} par mois")
+    if len(listings) > MAX_LISTINGS:
+        lines.append(f"… et {len(listings) - MAX_LISTINGS} autres.")
+    subject = f"{len(listings)} nouvelle(s) annonce(s) pour vos recherches"
+    return EmailMessage(subject, '\n'.join(lines), settings.DEFAULT_FROM_EMAIL, [email])
+
+
+def send_digests():
+    """Email every user their unnotified matches. Returns the number of emails sent."""
+    sent = 0
+    batch, batch_ids = [], []
+
+    def flush(connection):
+        count = connection.send_messages(batch) or 0
+        SearchMatch.objects.filter(pk__in=batch_ids).update(notified_at=timezone.now())
+        return count
+
+    with get_connection() as connection:
+        for user, listings, ids in _pending():
+            batch.append(build_email(user, listings))
+            batch_ids.extend(ids)
+            if len(batch) >= BATCH_SIZE:
+                sent += flush(connection)
+                batch, batch_ids = [], []
+        if batch:
+            sent += flush(connection)
+    logger.info('Saved search digests: %s emails.', sent)
+    return sent
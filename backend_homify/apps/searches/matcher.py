@@ -0,0 +1,168 @@
+"""
+Incremental matching of new listings against saved searches.
+
+All saved searches are loaded into an in-memory `SearchIndex`: one
+inverted index per discrete criterion (type, city, district, rooms,
+furnished) mapping a value to the searches requiring it, plus the
+searches leaving it open; and, for rent and surface, the lower and upper
+bounds of every search in sorted arrays. A listing is matched by
+intersecting the postings of its values with the searches whose bounds
+contain its rent and surface, so no search is evaluated one by one.
+
+Each process keeps its index until the version stored in the cache is
+bumped by a saved search change.
+"""
+import time
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+
+from .models import SavedSearch, SearchMatch
+
+VERSION_KEY = 'searches:index:version'
+
+DISCRETE_CRITERIA = ('type', 'city', 'district', 'number_of_rooms', 'furnished')
+RANGE_CRITERIA = {
+    'monthly_rent': ('min_price', 'max_price'),
+    'surface': ('min_surface', 'max_surface'),
+}
+
+
+def normalize(criterion, value):
+    """Return the index key of a criterion value, None when left open."""
+    if value is None or value == '':
+        return None
+    if criterion in ('city', 'district'):
+        return ' '.join(str(value).split()).casefold()
+    return value
+
+
+class RangeIndex:
+    """Searches by lower and upper bound, answering "which ranges contain x"."""
+
+    def __init__(self, bounds):
+        # Open bounds are stored as infinities
+        lows = sorted((float('-inf') if low is None else float(low), pk) for pk, low, _ in bounds)
+        highs = sorted((float('inf') if high is None else float(high), pk) for pk, _, high in bounds)
+        self.low_values = [value for value, _ in lows]
+        self.low_ids = [pk for _, pk in lows]
+        self.high_values = [value for value, _ in highs]
+        self.high_ids = [pk for _, pk in highs]
+
+    def containing(self, value):
+        value = float(value)
+        low_ok = self.low_ids[:bisect_right(self.low_values, value)]
+        high_ok = self.high_ids[bisect_left(self.high_values, value):]
+        if len(low_ok) > len(high_ok):
+            low_ok, high_ok = high_ok, low_ok
+        return set(low_ok).intersection(high_ok)
+
+
+class SearchIndex:
+    """In-memory index of all saved searches."""
+
+    def __init__(self, searches):
+        self.users = {}
+        self.postings = {criterion: {} for criterion in DISCRETE_CRITERIA}
+        self.open = {criterion: set() for criterion in DISCRETE_CRITERIA}
+        bounds = {attribute: [] for attribute in RANGE_CRITERIA}
+
+        for search in searches:
+            pk = search['id']
+            self.users[pk] = search['user_id']
+            for criterion in DISCRETE_CRITERIA:
+                key = normalize(criterion, search[criterion])
+                if key is None:
+                    self.open[criterion].add(pk)
+                else:
+                    self.postings[criterion].setdefault(key, set()).add(pk)
+            for attribute, (low, high) in RANGE_CRITERIA.items():
+                bounds[attribute].append((pk, search[low], search[high]))
+
+        self.ranges = {attribute: RangeIndex(values) for attribute, values in bounds.items()}
+
+    def __len__(self):
+        return len(self.users)
+
+    def match(self, listing):
+        """Return the ids of the searches matched by a listing's attributes."""
+        candidates = None
+        for criterion in DISCRETE_CRITERIA:
+            key = normalize(criterion, listing.get(criterion))
+            matching = self.open[criterion] | self.postings[criterion].get(key, set())
+            candidates = matching if candidates is None else candidates & matching
+            if not candidates:
+                return set()
+
+        for attribute, ranges in self.ranges.items():
+            value = listing.get(attribute)
+            if value is None:
+                return set()
+            candidates &= ranges.containing(value)
+            if not candidates:
+                break
+        return candidates
+
+
+_index = None
+_index_version = None
+
+
+def bump_version():
+    """Make every process reload its index on next use."""
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def get_index():
+    """Return this process's index, reloaded when the searches changed."""
+    global _index, _index_version
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        bump_version()
+        version = cache.get(VERSION_KEY)
+    if _index is None or version != _index_version:
+        bounds = [field for pair in RANGE_CRITERIA.values() for field in pair]
+        fields = ('id', 'user_id', *DISCRETE_CRITERIA, *bounds)
+        _index = SearchIndex(SavedSearch.objects.values(*fields).iterator())
+        _index_version = version
+    return _index
+
+
+def listing_attributes(property_obj):
+    address = getattr(property_obj, 'address', None)
+    return {
+        'type': property_obj.type,
+        'city': address.city if address else None,
+        'district': address.district if address else None,
+        'number_of_rooms': property_obj.number_of_rooms,
+        'furnished': property_obj.furnished,
+        'monthly_rent': property_obj.monthly_rent,
+        'surface': property_obj.surface,
+    }
+
+
+def match_property(property_id):
+    """Record the saved searches matched by a newly published property."""
+    from apps.properties.models import Property
+
+    property_obj = Property.objects.filter(
+        pk=property_id, status='PUBLISHED'
+    ).select_related('address').first()
+    if property_obj is None:
+        return 0
+
+    index = get_index()
+    search_ids = index.match(listing_attributes(property_obj))
+    if not search_ids:
+        return 0
+
+    # Searches deleted since the index was loaded are skipped
+    existing = SavedSearch.objects.filter(pk__in=search_ids).values_list('pk', flat=True)
+    matches = [
+        SearchMatch(search_id=pk, user_id=index.users[pk], property_id=property_id)
+        for pk in sorted(existing)
+        # Landlords are not told about their own listings
+        if index.users[pk] != property_obj.landlord_id
+    ]
+    SearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+    return len(matches)
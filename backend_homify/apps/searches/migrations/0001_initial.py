@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('properties', '0012_pricechange'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom')),
+                ('type', models.CharField(blank=True, max_length=20, verbose_name='Type')),
+                ('city', models.CharField(blank=True, max_length=100, verbose_name='Ville')),
+                ('district', models.CharField(blank=True, max_length=100, verbose_name='Quartier')),
+                ('number_of_rooms', models.PositiveIntegerField(blank=True, null=True, verbose_name='Nombre de pièces')),
+                ('furnished', models.BooleanField(blank=True, null=True, verbose_name='Meublé')),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Loyer minimum')),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Loyer maximum')),
+                ('min_surface', models.FloatField(blank=True, null=True, verbose_name='Surface minimum')),
+                ('max_surface', models.FloatField(blank=True, null=True, verbose_name='Surface maximum')),
+                ('notify', models.BooleanField(default=True, verbose_name='Recevoir le récapitulatif')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Recherche enregistrée',
+                'verbose_name_plural': 'Recherches enregistrées',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de correspondance')),
+                ('notified_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de notification')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to='properties.property', verbose_name='Propriété')),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='searches.savedsearch', verbose_name='Recherche')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Correspondance',
+                'verbose_name_plural': 'Correspondances',
+                'ordering': ['-matched_at'],
+                'indexes': [models.Index(fields=['user', '-matched_at'], name='searches_se_user_id_844679_idx'), models.Index(fields=['notified_at', 'user'], name='searches_se_notifie_39dbec_idx')],
+                'unique_together': {('search', 'property')},
+            },
+        ),
+    ]
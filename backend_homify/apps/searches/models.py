@@ -0,0 +1,81 @@
+"""
+Saved search models.
+"""
+from django.db import models
+from django.conf import settings
+
+
+class SavedSearch(models.Model):
+    """Stored property filter of a user, matched against new listings."""
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='saved_searches',
+        verbose_name='Utilisateur'
+    )
+    name = models.CharField(max_length=100, verbose_name='Nom')
+    
+    # Empty criteria match every listing
+    type = models.CharField(max_length=20, blank=True, verbose_name='Type')
+    city = models.CharField(max_length=100, blank=True, verbose_name='Ville')
+    district = models.CharField(max_length=100, blank=True, verbose_name='Quartier')
+    number_of_rooms = models.PositiveIntegerField(null=True, blank=True, verbose_name='Nombre de pièces')
+    furnished = models.BooleanField(null=True, blank=True, verbose_name='Meublé')
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Loyer minimum')
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Loyer maximum')
+    min_surface = models.FloatField(null=True, blank=True, verbose_name='Surface minimum')
+    max_surface = models.FloatField(null=True, blank=True, verbose_name='Surface maximum')
+    
+    notify = models.BooleanField(default=True, verbose_name='Recevoir le récapitulatif')
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de création')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Date de modification')
+    
+    class Meta:
+        verbose_name = 'Recherche enregistrée'
+        verbose_name_plural = 'Recherches enregistrées'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.name}"
+
+
+class SearchMatch(models.Model):
+    """Newly published property matching a saved search."""
+    
+    search = models.ForeignKey(
+        SavedSearch,
+        on_delete=models.CASCADE,
+        related_name='matches',
+        verbose_name='Recherche'
+    )
+    # Denormalized from the search for the feed
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='search_matches',
+        verbose_name='Utilisateur'
+    )
+    property = models.ForeignKey(
+        'properties.Property',
+        on_delete=models.CASCADE,
+        related_name='search_matches',
+        verbose_name='Propriété'
+    )
+    
+    matched_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de correspondance')
+    notified_at = models.DateTimeField(null=True, blank=True, verbose_name='Date de notification')
+    
+    class Meta:
+        verbose_name = 'Correspondance'
+        verbose_name_plural = 'Correspondances'
+        ordering = ['-matched_at']
+        unique_together = ('search', 'property')
+        indexes = [
+            models.Index(fields=['user', '-matched_at']),
+            models.Index(fields=['notified_at', 'user']),
+        ]
+    
+    def __str__(self):
+        return f"{self.search_id} → {self.property_id}"
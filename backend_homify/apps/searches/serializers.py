@@ -0,0 +1,50 @@
+"""
+Serializers for saved searches app.
+"""
+from rest_framework import serializers
+from .models import SavedSearch, SearchMatch
+from apps.properties.models import Property
+from apps.properties.serializers import PropertyListSerializer, PropertyRelatedListSerializer
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """Serializer for SavedSearch model."""
+    
+    type = serializers.ChoiceField(choices=Property.TYPE_CHOICES, required=False, allow_blank=True)
+    
+    class Meta:
+        model = SavedSearch
+        fields = ('id', 'name', 'type', 'city', 'district', 'number_of_rooms', 'furnished',
+                  'min_price', 'max_price', 'min_surface', 'max_surface', 'notify',
+                  'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_at', 'updated_at')
+    
+    def validate(self, attrs):
+        """Check that ranges are not inverted."""
+        for low, high in (('min_price', 'max_price'), ('min_surface', 'max_surface')):
+            low_value = attrs.get(low, getattr(self.instance, low, None))
+            high_value = attrs.get(high, getattr(self.instance, high, None))
+            if low_value is not None and high_value is not None and low_value > high_value:
+                raise serializers.ValidationError({high: 'Doit être supérieur ou égal au minimum.'})
+        return attrs
+    
+    def create(self, validated_data):
+        """Create saved search."""
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+
+class SearchMatchSerializer(serializers.ModelSerializer):
+    """Feed entry: a new listing matching a saved search."""
+    
+    search = serializers.SerializerMethodField()
+    property = PropertyListSerializer(read_only=True)
+    
+    class Meta:
+        model = SearchMatch
+        fields = ('id', 'search', 'property', 'matched_at')
+        list_serializer_class = PropertyRelatedListSerializer
+    
+    def get_search(self, obj):
+        """Get search id and name."""
+        return {'id': obj.search_id, 'name': obj.search.name}
@@ -0,0 +1,29 @@
+"""
+Signal handlers feeding the saved search matcher.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.properties.models import Property
+from rental_project.celery import enqueue
+
+from . import matcher
+from .models import SavedSearch
+from .tasks import match_saved_searches
+
+
+@receiver(post_save, sender=SavedSearch)
+@receiver(post_delete, sender=SavedSearch)
+def reload_search_index(sender, **kwargs):
+    """Make the matcher reload its index after a saved search change."""
+    transaction.on_commit(matcher.bump_version)
+
+
+@receiver(post_save, sender=Property)
+def match_new_listing(sender, instance, **kwargs):
+    """Match a property against the saved searches when it gets published."""
+    if instance.status != 'PUBLISHED' or instance.was_published:
+        return
+    property_id = instance.pk
+    transaction.on_commit(lambda: enqueue(match_saved_searches, property_id))
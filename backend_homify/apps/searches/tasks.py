@@ -0,0 +1,18 @@
+"""
+Celery tasks for saved searches app.
+"""
+from celery import shared_task
+
+
+@shared_task
+def match_saved_searches(property_id):
+    """Record the saved searches matched by a newly published property."""
+    from .matcher import match_property
+    return match_property(property_id)
+
+
+@shared_task
+def send_saved_search_digests():
+    """Email users the new listings matching their saved searches."""
+    from .digest import send_digests
+    return send_digests()
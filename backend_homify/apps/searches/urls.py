@@ -0,0 +1,13 @@
+"""
+URL configuration for saved searches app.
+"""
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SavedSearchViewSet
+
+router = DefaultRouter()
+router.register(r'', SavedSearchViewSet, basename='saved-searches')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
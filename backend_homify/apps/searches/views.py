@@ -0,0 +1,51 @@
+"""
+Views for saved searches app.
+"""
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .models import SavedSearch, SearchMatch
+from .serializers import SavedSearchSerializer, SearchMatchSerializer
+from rental_project.instrumentation import InstrumentedViewMixin
+
+MAX_SAVED_SEARCHES = 20
+
+
+class SavedSearchViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
+    """ViewSet for SavedSearch model."""
+    
+    serializer_class = SavedSearchSerializer
+    permission_classes = (IsAuthenticated,)
+    
+    def get_queryset(self):
+        """Get current user's saved searches."""
+        return SavedSearch.objects.filter(user=self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        """Save a search, up to MAX_SAVED_SEARCHES per user."""
+        if self.get_queryset().count() >= MAX_SAVED_SEARCHES:
+            return Response(
+                {'error': f'Vous ne pouvez pas enregistrer plus de {MAX_SAVED_SEARCHES} recherches.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().create(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['get'])
+    def feed(self, request):
+        """Get new listings matching the user's saved searches, most recent first."""
+        matches = SearchMatch.objects.filter(
+            user=request.user, property__status='PUBLISHED'
+        ).select_related('search', 'property__address').order_by('-matched_at', '-id')
+        
+        search_id = request.query_params.get('search')
+        if search_id and search_id.isdigit():
+            matches = matches.filter(search_id=search_id)
+        
+        page = self.paginate_queryset(matches)
+        if page is not None:
+            serializer = SearchMatchSerializer(page, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = SearchMatchSerializer(matches, many=True, context={'request': request})
+        return Response(serializer.data)
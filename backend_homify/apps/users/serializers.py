@@ -114,4 +114,6 @@ class AdminUserSerializer(serializers.ModelSerializer):
     
     def get_properties_count(self, obj):
         """Get count of user's properties."""
+        if hasattr(obj, 'properties_total'):
+            return obj.properties_total
         return obj.properties.count()
@@ -8,16 +8,18 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomTokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, UserProfileSerializer,
     PasswordChangeSerializer, AdminUserSerializer
 )
 from .permissions import IsAdmin
+from rental_project.instrumentation import InstrumentedViewMixin
 
 User = get_user_model()
 
 
-class UserRegistrationView(generics.CreateAPIView):
+class UserRegistrationView(InstrumentedViewMixin, generics.CreateAPIView):
     """User registration endpoint."""
     
     queryset = User.objects.all()
@@ -35,7 +37,7 @@ class UserRegistrationView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(InstrumentedViewMixin, generics.RetrieveUpdateAPIView):
     """Get and update user profile."""
     
     permission_classes = (IsAuthenticated,)
@@ -45,7 +47,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class PasswordChangeView(generics.GenericAPIView):
+class PasswordChangeView(InstrumentedViewMixin, generics.GenericAPIView):
     """Change user password."""
     
     permission_classes = (IsAuthenticated,)
@@ -76,10 +78,12 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
-class AdminUserViewSet(viewsets.ModelViewSet):
+class AdminUserViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """Admin user management viewset."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.annotate(
+        properties_total=Count('properties')
+    ).order_by('-created_at')
     serializer_class = AdminUserSerializer
     permission_classes = (IsAuthenticated, IsAdmin)
     filterset_fields = ['role', 'status', 'email_verified']
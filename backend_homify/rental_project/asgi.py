@@ -0,0 +1,17 @@
+"""
+ASGI config for rental_project.
+
+Required for the chat event stream; run with
+`uvicorn rental_project.asgi:application`.
+"""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rental_project.settings')
+django_application = get_asgi_application()
+
+# Imported once Django is set up: the stream is served outside Django so it
+# can see client disconnects (see apps/chat/streams.py)
+from apps.chat.streams import with_message_stream  # noqa: E402
+
+application = with_message_stream(django_application)
@@ -1,6 +1,7 @@
 """
 Celery configuration for async tasks.
 """
+import logging
 import os
 from celery import Celery
 
@@ -9,3 +10,14 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rental_project.settings')
 app = Celery('rental_project')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, *args, **kwargs):
+    """Queue a task without failing the request if the broker is down."""
+    try:
+        return task.delay(*args, **kwargs)
+    except Exception:
+        logger.exception('Could not queue task %s.', task.name)
+        return None
@@ -0,0 +1,158 @@
+"""
+Per-endpoint performance instrumentation.
+
+`PerformanceMiddleware` counts the SQL queries and database time of every
+request through `connection.execute_wrapper` and measures total latency.
+`InstrumentedViewMixin` labels the request with its `<basename>.<action>`
+endpoint and times the rendering of its response, whichever way the view
+built its serializers. Measurements are logged and checked against
+`PERFORMANCE_BUDGETS`; `manage.py check_performance_budgets` checks them
+over seeded data.
+"""
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('performance_metrics', default=None)
+
+
+class BudgetExceeded(Exception):
+    """Raised when an endpoint exceeds its budget in `raise` mode."""
+
+
+class Metrics:
+    """Measurements of a single request."""
+
+    def __init__(self):
+        self.endpoint = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.total_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a database execute wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def as_dict(self):
+        return {
+            'endpoint': self.endpoint,
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'serialization_ms': round(self.serialization_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+
+def current_metrics():
+    """Return the metrics of the request being processed, if any."""
+    return _current.get()
+
+
+def get_budget(endpoint):
+    return getattr(settings, 'PERFORMANCE_BUDGETS', {}).get(endpoint)
+
+
+def budget_violations(metrics, budget=None):
+    """Return human readable descriptions of the exceeded limits."""
+    budget = budget if budget is not None else get_budget(metrics.endpoint)
+    if not budget:
+        return []
+
+    violations = []
+    if 'queries' in budget and metrics.queries > budget['queries']:
+        violations.append(f"{metrics.queries} queries > {budget['queries']}")
+    limits = {
+        'db_ms': metrics.db_time,
+        'serialization_ms': metrics.serialization_time,
+        'total_ms': metrics.total_time,
+    }
+    for name, value in limits.items():
+        if name in budget and value * 1000 > budget[name]:
+            violations.append(f'{name} {value * 1000:.1f} > {budget[name]}')
+    return violations
+
+
+class PerformanceMiddleware:
+    """Measure every request and enforce the endpoint budgets."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = Metrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            _current.reset(token)
+
+        response.performance = metrics
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'db;dur={metrics.db_time * 1000:.1f}, '
+                f'serialize;dur={metrics.serialization_time * 1000:.1f}, '
+                f'total;dur={metrics.total_time * 1000:.1f}'
+            )
+            response['X-Query-Count'] = str(metrics.queries)
+
+        if metrics.endpoint:
+            self.check_budget(metrics)
+        return response
+
+    @staticmethod
+    def check_budget(metrics):
+        logger.debug('%s', metrics.as_dict())
+        violations = budget_violations(metrics)
+        if not violations:
+            return
+
+        message = f"Budget dépassé pour {metrics.endpoint}: {', '.join(violations)}"
+        if getattr(settings, 'PERFORMANCE_BUDGET_MODE', 'log') == 'raise':
+            raise BudgetExceeded(message)
+        logger.warning(message)
+
+
+class InstrumentedViewMixin:
+    """Label requests with their endpoint and time response rendering."""
+
+    def initial(self, request, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is not None:
+            name = getattr(self, 'basename', None) or type(self).__name__
+            action = getattr(self, 'action', None) or request.method.lower()
+            metrics.endpoint = f'{name}.{action}'
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        metrics = current_metrics()
+        # Cached responses are plain HttpResponses, already rendered
+        if metrics is not None and hasattr(response, 'render'):
+            render = response.render
+
+            def timed():
+                start = time.perf_counter()
+                try:
+                    return render()
+                finally:
+                    metrics.serialization_time += time.perf_counter() - start
+
+            response.render = timed
+        return response
@@ -0,0 +1,197 @@
+"""
+Pagination classes for the API.
+"""
+import base64
+import datetime
+import decimal
+import json
+from collections import OrderedDict
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode.
+
+    Passing `cursor` (empty for the first page) switches to keyset mode: the
+    queryset ordering, completed with an `id` tiebreaker, is turned into a
+    seek predicate so every page costs the same whatever its depth, and no
+    COUNT(*) is run. `count=approx` adds an estimated total.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    approximate_count_cap = 10000
+    invalid_cursor_message = 'Curseur invalide.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        position, reverse = self.decode_cursor(request)
+
+        self.approximate_count = None
+        if request.query_params.get(self.count_query_param) == 'approx':
+            self.approximate_count = self.get_approximate_count(queryset)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self.invert(term) for term in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Going backwards always leaves a next page, and vice versa
+        has_next = has_more if not reverse else position is not None
+        has_previous = has_more if reverse else position is not None
+
+        self.next_position = self.get_position(results[-1]) if results and has_next else None
+        self.previous_position = self.get_position(results[0]) if results and has_previous else None
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        payload = [
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ]
+        if self.approximate_count is not None:
+            payload += [('count', self.approximate_count), ('count_is_approximate', True)]
+        payload.append(('results', data))
+        return Response(OrderedDict(payload))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_ordering(self, queryset):
+        """Return the queryset ordering completed with a unique `id` tiebreaker."""
+        query = queryset.query
+        ordering = list(query.order_by) or (
+            list(queryset.model._meta.ordering) if query.default_ordering else []
+        )
+
+        pk_name = queryset.model._meta.pk.name
+        terms = []
+        for term in ordering:
+            if not isinstance(term, str):
+                raise NotFound('Ce tri ne prend pas en charge la pagination par curseur.')
+            name = term.lstrip('-')
+            if name == 'pk':
+                term = term.replace('pk', pk_name)
+            terms.append(term)
+
+        if not any(term.lstrip('-') == pk_name for term in terms):
+            descending = bool(terms) and terms[0].startswith('-')
+            terms.append(f'-{pk_name}' if descending else pk_name)
+        return terms
+
+    @staticmethod
+    def invert(term):
+        return term[1:] if term.startswith('-') else f'-{term}'
+
+    @staticmethod
+    def seek_filter(ordering, position):
+        """Build `(f1, f2, ...) > (v1, v2, ...)` honouring each field direction."""
+        condition = Q()
+        equal = Q()
+        for term, value in zip(ordering, position):
+            name = term.lstrip('-')
+            lookup = 'lt' if term.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, instance):
+        values = []
+        for term in self.ordering:
+            value = instance
+            for attr in term.lstrip('-').split('__'):
+                value = getattr(value, attr)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            'p': [self.encode_value(value) for value in position],
+            'o': self.ordering,
+        }
+        if reverse:
+            payload['r'] = 1
+
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        url = remove_query_param(self.base_url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """Return (position, reverse) from the request, (None, False) on the first page."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if payload.get('o') != self.ordering or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+        if hasattr(value, 'pk'):
+            return value.pk
+        return value
+
+    def get_approximate_count(self, queryset):
+        """Estimate the result count from the planner, or count up to a cap."""
+        queryset = queryset.order_by()
+        connection = connections[queryset.db]
+
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+        return queryset[:self.approximate_count_cap].count()
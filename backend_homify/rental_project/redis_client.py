@@ -0,0 +1,43 @@
+"""
+Shared Redis connection for counters and buffers.
+"""
+from contextlib import contextmanager
+
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """Return a lazily created Redis client bound to REDIS_URL."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=getattr(settings, 'REDIS_SOCKET_TIMEOUT', 1),
+            socket_timeout=getattr(settings, 'REDIS_SOCKET_TIMEOUT', 1),
+            decode_responses=True,
+        )
+    return _client
+
+
+@contextmanager
+def exclusive(name, timeout=300):
+    """
+    Hold a Redis lock (SET NX EX) for the duration of the block.
+
+    Yields False without waiting when another process holds it. The lock
+    expires after `timeout` seconds should its holder die.
+    """
+    lock = get_redis().lock(name, timeout=timeout)
+    acquired = lock.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                # Expired and possibly taken over, nothing left to release
+                pass
@@ -5,6 +5,8 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,9 +41,11 @@ INSTALLED_APPS = [
     'apps.favorites',
     'apps.reports',
     'apps.amenities',
+    'apps.searches',
 ]
 
 MIDDLEWARE = [
+    'rental_project.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -71,6 +75,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'rental_project.wsgi.application'
+ASGI_APPLICATION = 'rental_project.asgi.application'
 
 # Database
 DATABASES = {
@@ -113,6 +118,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Photo uploads
+PHOTO_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+PHOTO_UPLOAD_MAX_CHUNK_SIZE = 1024 * 1024
+PHOTO_UPLOAD_TEMP_DIR = BASE_DIR / 'media' / 'uploads'
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -127,7 +137,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'rental_project.pagination.KeysetPagination',
     'PAGE_SIZE': 12,
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -169,6 +179,48 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # Redis Configuration
 REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
 
+# Cache Configuration
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'rental',
+    }
+}
+
+# Anonymous property responses (seconds)
+PROPERTY_CACHE_TIMEOUT = int(os.getenv('PROPERTY_CACHE_TIMEOUT', '300'))
+
+# Price-drop alert emails sent per mail connection batch
+PRICE_ALERT_BATCH_SIZE = int(os.getenv('PRICE_ALERT_BATCH_SIZE', '100'))
+
+# Moderation queue: seconds a moderator keeps the properties they claimed
+MODERATION_LEASE_SECONDS = int(os.getenv('MODERATION_LEASE_SECONDS', '600'))
+
+# Chat event stream: seconds between keepalive comments
+CHAT_STREAM_KEEPALIVE = int(os.getenv('CHAT_STREAM_KEEPALIVE', '15'))
+
+# Performance budgets per `<basename>.<action>` endpoint. Exceeding one is
+# logged, or raises BudgetExceeded when PERFORMANCE_BUDGET_MODE is 'raise'.
+PERFORMANCE_BUDGET_MODE = os.getenv('PERFORMANCE_BUDGET_MODE', 'log')
+PERFORMANCE_BUDGETS = {
+    'properties.list': {'queries': 6, 'total_ms': 300},
+    'properties.retrieve': {'queries': 6, 'total_ms': 200},
+    'properties.my_properties': {'queries': 6, 'total_ms': 300},
+    'properties.similar': {'queries': 6, 'total_ms': 200},
+    'properties.facets': {'queries': 2, 'total_ms': 200},
+    'properties.stats': {'queries': 2, 'total_ms': 200},
+    'properties.my_properties_analytics': {'queries': 3, 'total_ms': 200},
+    'favorites.list': {'queries': 5, 'total_ms': 300},
+    'messages.list': {'queries': 5, 'total_ms': 300},
+    'messages.conversations': {'queries': 3, 'total_ms': 200},
+    'reports.list': {'queries': 5, 'total_ms': 300},
+    'admin-users.list': {'queries': 3, 'total_ms': 300},
+    'admin-properties.pending': {'queries': 4, 'total_ms': 300},
+    'admin-properties.claim': {'queries': 6, 'total_ms': 300},
+    'amenities.list': {'queries': 3, 'total_ms': 100},
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -176,3 +228,45 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-property-views': {
+        'task': 'apps.properties.tasks.flush_property_views',
+        'schedule': int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', '30')),
+    },
+    'flush-property-analytics': {
+        'task': 'apps.properties.tasks.flush_property_analytics',
+        'schedule': int(os.getenv('ANALYTICS_FLUSH_INTERVAL', '60')),
+    },
+    'purge-property-analytics': {
+        'task': 'apps.properties.tasks.purge_property_analytics',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'purge-stale-photo-uploads': {
+        'task': 'apps.properties.tasks.purge_stale_photo_uploads',
+        'schedule': crontab(minute=30),
+    },
+    'rebuild-similar-properties': {
+        'task': 'apps.properties.tasks.rebuild_similar_properties',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'rebuild-market-stats': {
+        'task': 'apps.properties.tasks.rebuild_market_stats',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'refresh-moderation-queue': {
+        'task': 'apps.properties.tasks.refresh_moderation_queue',
+        'schedule': crontab(minute='*/5'),
+    },
+    'send-price-drop-alerts': {
+        'task': 'apps.properties.tasks.send_price_drop_alerts',
+        'schedule': int(os.getenv('PRICE_ALERT_INTERVAL', '300')),
+    },
+    'send-saved-search-digests': {
+        'task': 'apps.searches.tasks.send_saved_search_digests',
+        'schedule': crontab(hour=8, minute=0),
+    },
+    'reconcile-unread-counts': {
+        'task': 'apps.chat.tasks.reconcile_unread_counts',
+        'schedule': crontab(minute=45),
+    },
+}
@@ -0,0 +1,133 @@
+"""
+Test helpers for endpoint performance budgets.
+
+`seed_data` inserts a realistic volume of listings, photos, favorites and
+users so that N+1 queries show up in the query counts; `check_budgets`
+runs requests against it. Both are used by `manage.py
+check_performance_budgets`.
+"""
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from .instrumentation import budget_violations, get_budget
+
+
+def assert_within_budget(response, endpoint=None, budget=None):
+    """
+    Assert that a test client response stayed within its endpoint budget.
+
+    The response must come through `PerformanceMiddleware`. `endpoint`
+    guards against checking the wrong view; `budget` overrides the one
+    configured in `PERFORMANCE_BUDGETS`.
+    """
+    metrics = getattr(response, 'performance', None)
+    assert metrics is not None, 'La réponse n\'a pas été instrumentée.'
+    if endpoint is not None:
+        assert metrics.endpoint == endpoint, f'{metrics.endpoint} != {endpoint}'
+
+    budget = budget if budget is not None else get_budget(metrics.endpoint)
+    assert budget, f'Aucun budget défini pour {metrics.endpoint}.'
+
+    violations = budget_violations(metrics, budget)
+    assert not violations, f"{metrics.endpoint}: {', '.join(violations)}"
+    return metrics
+
+
+def check_budgets(client, requests):
+    """
+    Run (method, url, kwargs) requests and check each one's budget.
+
+    Returns {endpoint: metrics dict}; raises AssertionError on the first
+    endpoint over budget.
+    """
+    results = {}
+    for method, url, kwargs in requests:
+        response = getattr(client, method)(url, **kwargs)
+        metrics = assert_within_budget(response)
+        results[metrics.endpoint] = metrics.as_dict()
+    return results
+
+
+def seed_data(landlords=10, properties_per_landlord=10, photos_per_property=3, tenants=20, amenities=8):
+    """
+    Insert seeded users, published listings, photos, amenities and favorites.
+
+    Rows are bulk inserted without signals; the listing table is synced
+    explicitly. Returns {'admin', 'landlord', 'tenant'} users to
+    authenticate the checked requests with.
+    """
+    from apps.amenities.models import Amenity
+    from apps.favorites.models import Favorite
+    from apps.properties import amenity_mask, listing_index
+    from apps.properties.models import Address, Photo, Property
+
+    User = get_user_model()
+    tag = uuid.uuid4().hex[:8]
+
+    def users(role, count):
+        return User.objects.bulk_create([
+            User(
+                email=f'{role.lower()}-{tag}-{index}@seed.test',
+                first_name=role.title(), last_name=str(index), role=role,
+            )
+            for index in range(count)
+        ])
+
+    admin = User.objects.create_user(
+        f'admin-{tag}@seed.test', first_name='Admin', last_name='Seed', role='ADMIN'
+    )
+    owners = users('LANDLORD', landlords)
+    renters = users('TENANT', tenants)
+
+    types = [choice for choice, _ in Property.TYPE_CHOICES]
+    properties = Property.objects.bulk_create([
+        Property(
+            landlord=owner,
+            title=f'Annonce {owner.pk}-{index}',
+            description='Annonce de test de performance.',
+            type=types[index % len(types)],
+            surface=20 + 5 * index,
+            number_of_rooms=1 + index % 5,
+            number_of_bedrooms=index % 4,
+            number_of_bathrooms=1,
+            monthly_rent=Decimal(50000 + 10000 * index),
+            status='PUBLISHED',
+        )
+        for owner in owners
+        for index in range(properties_per_landlord)
+    ])
+
+    Address.objects.bulk_create([
+        Address(
+            property=obj, street_address=f'{obj.pk} rue de test', city='Yaoundé',
+            postal_code='00000', district=f'Quartier {obj.pk % 5}',
+        )
+        for obj in properties
+    ])
+    Photo.objects.bulk_create([
+        Photo(property=obj, image=f'properties/seed/{obj.pk}-{index}.jpg', order=index, is_primary=index == 0)
+        for obj in properties
+        for index in range(photos_per_property)
+    ])
+
+    seeded_amenities = Amenity.objects.bulk_create([
+        Amenity(name=f'Équipement {tag} {index}', category='COMFORT') for index in range(amenities)
+    ])
+    Link = Property.amenities.through
+    Link.objects.bulk_create([
+        Link(property_id=obj.pk, amenity_id=amenity.pk)
+        for obj in properties
+        for amenity in seeded_amenities[:1 + obj.pk % amenities]
+    ])
+    Favorite.objects.bulk_create([
+        Favorite(user=renter, property=obj)
+        for renter in renters
+        for obj in properties[renter.pk % 7::7]
+    ])
+
+    property_ids = [obj.pk for obj in properties]
+    amenity_mask.refresh_masks(property_ids)
+    listing_index.sync_properties(property_ids)
+    return {'admin': admin, 'landlord': owners[0], 'tenant': renters[0]}
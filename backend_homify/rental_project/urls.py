@@ -35,6 +35,7 @@ urlpatterns = [
     path('api/messages/', include('apps.chat.urls')),
     path('api/amenities/', include('apps.amenities.urls')),
     path('api/reports/', include('apps.reports.urls')),
+    path('api/searches/', include('apps.searches.urls')),
 ]
 
 if settings.DEBUG: